@@ -0,0 +1,208 @@
+# asset_module.py
+"""
+Local copies of the page's third-party assets: the Lottie animation and the
+weather hero images. Each is fetched once, with strict timeouts, and kept
+on disk under static/ (served by Streamlit at app/static/, see
+.streamlit/config.toml). Hero images are stored as downscaled WebP variants
+instead of 2,000-pixel originals.
+
+    python asset_module.py build     # fetch + downscale everything (e.g. at deploy time)
+    python asset_module.py status    # what's on disk
+
+The page never waits on a CDN: a missing asset is fetched in a background
+thread while the page shows a gradient (hero) or nothing (animation).
+"""
+import json
+import os
+import sys
+import threading
+import time
+import http_client
+from metrics_module import inc, timed
+
+ASSET_DIR = os.environ.get("VOGUE_ASSET_DIR", "static")
+STATIC_URL = "app/static"  # where Streamlit serves ASSET_DIR
+ASSET_TIMEOUT = float(os.environ.get("VOGUE_ASSET_TIMEOUT", 3))  # seconds, connect and read
+ASSETS_OFFLINE = os.environ.get("VOGUE_ASSETS_OFFLINE", "0") == "1"  # never fetch at runtime
+RETRY_AFTER = 300  # seconds before a failed fetch is tried again
+
+# Hero variants: the browser picks one from srcset
+HERO_WIDTHS = (640, 1280)
+HERO_QUALITY = 72
+
+LOTTIE_SOURCES = {
+    "hanger": "https://lottie.host/629df572-8812-426c-8238-662d55639688/d73T7pSgP2.json",
+}
+
+HERO_SOURCES = {
+    "Rainy": "https://images.unsplash.com/photo-1534260164206-2a3a4a72891d?q=80&w=2070&auto=format&fit=crop",
+    "Hot": "https://images.unsplash.com/photo-1507525428034-b723cf961d3e?q=80&w=2073&auto=format&fit=crop",
+    "Cold": "https://images.unsplash.com/photo-1483985988355-763728e1935b?q=80&w=2070&auto=format&fit=crop",
+    "Moderate": "https://images.unsplash.com/photo-1496747611176-843222e1e57c?q=80&w=2073&auto=format&fit=crop",
+}
+
+# Shown until (or instead of) the real image: a two-stop gradient per weather
+HERO_FALLBACK_COLORS = {
+    "Rainy": ("#1C2633", "#41536A"),
+    "Hot": ("#3A2A12", "#C98B3A"),
+    "Cold": ("#1A2230", "#8FA6BF"),
+    "Moderate": ("#1E1E22", "#6B5F55"),
+}
+
+_lottie_cache = {}
+_hero_cache = {}
+_inflight = set()
+_failed = {}  # asset key -> time of the last failed fetch
+_lock = threading.Lock()
+
+
+# --- PATHS ---
+def lottie_path(name):
+    return os.path.join(ASSET_DIR, "lottie", f"{name}.json")
+
+
+def hero_path(weather, width):
+    return os.path.join(ASSET_DIR, "hero", f"{weather.lower()}_{width}.webp")
+
+
+def _hero_key(weather_condition):
+    return weather_condition if weather_condition in HERO_SOURCES else "Moderate"
+
+
+# --- FETCHING ---
+def _download(url):
+    response = http_client.get(url, timeout=(ASSET_TIMEOUT, ASSET_TIMEOUT))
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code} for {url}")
+    return response.content
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@timed("asset_fetch")
+def build_lottie(name):
+    """Downloads one animation and stores it minified."""
+    data = json.loads(_download(LOTTIE_SOURCES[name]))
+    _write_atomic(lottie_path(name), json.dumps(data, separators=(",", ":")).encode())
+
+
+@timed("asset_fetch")
+def build_hero(weather):
+    """Downloads one hero image and writes a WebP variant per width in HERO_WIDTHS."""
+    import io
+    from PIL import Image
+
+    original = Image.open(io.BytesIO(_download(HERO_SOURCES[weather]))).convert("RGB")
+    for width in HERO_WIDTHS:
+        image = original.copy()
+        image.thumbnail((width, width * 4))  # height is never the limit
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=HERO_QUALITY, method=6)
+        _write_atomic(hero_path(weather, width), buffer.getvalue())
+
+
+def _fetch_in_background(key, build):
+    """Runs `build()` on a daemon thread, at most once at a time per asset, and not right after a failure."""
+    if ASSETS_OFFLINE:
+        return
+    with _lock:
+        if key in _inflight or time.monotonic() - _failed.get(key, -RETRY_AFTER) < RETRY_AFTER:
+            return
+        _inflight.add(key)
+
+    def run():
+        try:
+            build()
+            _failed.pop(key, None)
+        except Exception as e:
+            print(f"⚠️ Could not fetch asset '{key}': {e}")
+            inc("vogue_asset_fetch_failures_total", asset=key)
+            _failed[key] = time.monotonic()
+        finally:
+            with _lock:
+                _inflight.discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+# --- LOADING (what the app calls) ---
+def load_lottie(name):
+    """The animation's JSON from disk (cached in-process), or None while it isn't available."""
+    cached = _lottie_cache.get(name)
+    if cached is not None:
+        return cached
+    try:
+        with open(lottie_path(name), encoding="utf-8") as f:
+            _lottie_cache[name] = json.load(f)
+        return _lottie_cache[name]
+    except (OSError, ValueError):
+        _fetch_in_background(f"lottie:{name}", lambda: build_lottie(name))
+        return None
+
+
+def _gradient_data_uri(weather):
+    top, bottom = HERO_FALLBACK_COLORS[weather]
+    svg = (f"<svg xmlns='http://www.w3.org/2000/svg' width='16' height='9'><defs><linearGradient id='g' x2='0' y2='1'>"
+           f"<stop offset='0' stop-color='{top}'/><stop offset='1' stop-color='{bottom}'/></linearGradient></defs>"
+           f"<rect width='16' height='9' fill='url(#g)'/></svg>")
+    return "data:image/svg+xml;utf8," + svg.replace("#", "%23")
+
+
+def hero_image(weather_condition):
+    """
+    (src, srcset) for the hero <img>. Local WebP variants once they exist;
+    until then a gradient placeholder while they're fetched in the background.
+    """
+    weather = _hero_key(weather_condition)
+    cached = _hero_cache.get(weather)
+    if cached is not None:
+        return cached
+
+    if all(os.path.exists(hero_path(weather, w)) for w in HERO_WIDTHS):
+        urls = [f"{STATIC_URL}/hero/{os.path.basename(hero_path(weather, w))}" for w in HERO_WIDTHS]
+        _hero_cache[weather] = (urls[-1], ", ".join(f"{url} {w}w" for url, w in zip(urls, HERO_WIDTHS)))
+        return _hero_cache[weather]
+
+    _fetch_in_background(f"hero:{weather}", lambda: build_hero(weather))
+    return _gradient_data_uri(weather), ""
+
+
+def build_all():
+    """Fetches every asset in the foreground. Returns {asset: error or None}."""
+    results = {}
+    jobs = [(f"lottie:{n}", lambda n=n: build_lottie(n)) for n in LOTTIE_SOURCES]
+    jobs += [(f"hero:{w}", lambda w=w: build_hero(w)) for w in HERO_SOURCES]
+    for key, build in jobs:
+        try:
+            build()
+            results[key] = None
+        except Exception as e:
+            results[key] = str(e)
+    return results
+
+
+def status():
+    """Every expected file and its size in bytes (None if missing)."""
+    paths = [lottie_path(n) for n in LOTTIE_SOURCES]
+    paths += [hero_path(w, width) for w in HERO_SOURCES for width in HERO_WIDTHS]
+    return {p: os.path.getsize(p) if os.path.exists(p) else None for p in paths}
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command == "build":
+        print(f"⏬ Fetching assets into '{ASSET_DIR}/'...")
+        failures = {k: e for k, e in build_all().items() if e}
+        for key, error in failures.items():
+            print(f"   ❌ {key}: {error}")
+        print("✅ All assets stored." if not failures else f"⚠️ {len(failures)} asset(s) failed; the app will fall back for those.")
+        sys.exit(1 if failures else 0)
+
+    for path, size in status().items():
+        print(f"   {'✅' if size else '❌'} {path}" + (f" ({size / 1024:.0f} KiB)" if size else ""))
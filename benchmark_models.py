@@ -0,0 +1,230 @@
+# benchmark_models.py
+"""
+Trains a set of candidate models on the generated dataset and measures what
+each one costs and how well it does, so the model choice in train_model.py
+is backed by numbers rather than by the project report.
+
+    python benchmark_models.py                          # all candidates
+    python benchmark_models.py --models tree_d3 freq    # a subset
+    python benchmark_models.py --data big.csv --aggregate
+
+For every candidate: fit time, single-row and batch predict latency, peak
+traced memory during fit, artifact size and held-out accuracy. Results go to
+a JSON report plus a summary table on stdout.
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from train_model import COLUMNS, count_rows, encode, fit_encoders, new_model
+from model_bundle import bundle_from_sklearn, write_bundle
+
+REPORT_PATH = 'model_benchmark.json'
+
+
+class FrequencyTable:
+    """
+    The simplest possible model: the most common outfit seen in each
+    (weather, event, skin) cell, falling back to the overall most common
+    outfit for cells missing from training.
+    """
+
+    def fit(self, X, y, sample_weight=None):
+        X = np.asarray(X)
+        weights = np.ones(len(y)) if sample_weight is None else np.asarray(sample_weight, dtype=float)
+        self.shape_ = tuple(int(c) + 1 for c in X.max(axis=0))
+        n_classes = int(np.max(y)) + 1
+
+        counts = np.zeros(self.shape_ + (n_classes,))
+        np.add.at(counts, tuple(X.T) + (y,), weights)
+        self.default_ = int(counts.sum(axis=(0, 1, 2)).argmax())
+        self.table_ = np.where(counts.sum(axis=-1) > 0, counts.argmax(axis=-1), self.default_)
+        return self
+
+    def predict(self, X):
+        X = np.asarray(X)
+        inside = np.all(X < self.shape_, axis=1)
+        clipped = np.minimum(X, np.array(self.shape_) - 1)
+        return np.where(inside, self.table_[tuple(clipped.T)], self.default_)
+
+
+def _tree(depth):
+    from sklearn.tree import DecisionTreeClassifier
+    return lambda: DecisionTreeClassifier(max_depth=depth, random_state=42)
+
+
+def _forest():
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(n_estimators=100, max_depth=None, random_state=42, n_jobs=1)
+
+
+def _naive_bayes():
+    from sklearn.naive_bayes import CategoricalNB
+    return CategoricalNB()
+
+
+# name -> zero-argument factory for an unfitted model
+CANDIDATES = {
+    "tree_d3": new_model,             # what train_model.py ships today
+    "tree_d5": _tree(5),
+    "tree_full": _tree(None),
+    "random_forest": _forest,
+    "naive_bayes": _naive_bayes,
+    "freq": FrequencyTable,
+}
+
+
+# --- MEASUREMENT ---
+def _percentiles_us(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+    return {"p50_us": round(pick(0.50), 2), "p95_us": round(pick(0.95), 2), "p99_us": round(pick(0.99), 2)}
+
+
+def time_fit(factory, X, y, weights, repeat):
+    """Best-of-`repeat` wall time for one fit, plus the peak memory traced during it."""
+    times = []
+    for _ in range(repeat):
+        model = factory()
+        start = time.perf_counter()
+        model.fit(X, y, sample_weight=weights)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        factory().fit(X, y, sample_weight=weights)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return model, min(times), peak
+
+
+def time_single(model, X, calls):
+    """Latency of predicting one row at a time, cycling through `X`."""
+    samples = []
+    for i in range(calls):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        model.predict(row)
+        samples.append(time.perf_counter() - start)
+    return _percentiles_us(samples)
+
+
+def time_batch(model, X, repeat):
+    """Best-of-`repeat` time to predict all of `X` in one call."""
+    best = min(_timed(model.predict, X) for _ in range(repeat))
+    return {"batch_rows": len(X), "batch_ms": round(best * 1e3, 3), "rows_per_s": round(len(X) / best)}
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def artifact_size(model, encoders):
+    """Pickled size, and for single trees the size of the model.bundle we'd actually ship."""
+    sizes = {"pickle_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))}
+    if hasattr(model, "tree_"):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.bundle")
+            write_bundle(path, *bundle_from_sklearn(model, *encoders))
+            sizes["bundle_bytes"] = os.path.getsize(path)
+    return sizes
+
+
+# --- DATA ---
+def load_split(path, aggregate=False, chunk_size=1_000_000, test_size=0.2):
+    """
+    Encoded train/test arrays. With `aggregate` the CSV is reduced to counts
+    first and the split is done on the expanded counts, so huge files still
+    fit in memory: the training side is passed on as (distinct rows, weights).
+    """
+    if aggregate:
+        df = count_rows(path, chunk_size)
+    else:
+        df = pd.read_csv(path, usecols=COLUMNS)
+        df['Count'] = 1
+
+    encoders = fit_encoders(df)
+    X, y = encode(df, *encoders)
+    X, y, counts = X.to_numpy(), np.asarray(y), df['Count'].to_numpy()
+
+    if not aggregate:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+        return X_train, y_train, None, X_test, y_test, encoders
+
+    # Hold out a share of every combination's rows, keep the rest as weights
+    rng = np.random.default_rng(42)
+    held_out = rng.binomial(counts, test_size)
+    train = counts - held_out
+    keep = train > 0
+    X_test = np.repeat(X, held_out, axis=0)
+    y_test = np.repeat(y, held_out)
+    return X[keep], y[keep], train[keep], X_test, y_test, encoders
+
+
+def benchmark(names, data_path, aggregate=False, repeat=3, single_calls=2000):
+    X_train, y_train, weights, X_test, y_test, encoders = load_split(data_path, aggregate)
+    results = []
+
+    for name in names:
+        print(f"⏱️  {name}...")
+        model, fit_s, peak = time_fit(CANDIDATES[name], X_train, y_train, weights, repeat)
+        accuracy = float((model.predict(X_test) == y_test).mean())
+        result = {
+            "model": name,
+            "fit_ms": round(fit_s * 1e3, 3),
+            "fit_peak_kib": round(peak / 1024, 1),
+            "accuracy": round(accuracy, 4),
+            "single": time_single(model, X_test, single_calls),
+            **time_batch(model, X_test, repeat),
+            **artifact_size(model, encoders),
+        }
+        results.append(result)
+
+    return {
+        "data": data_path,
+        "train_rows": int(weights.sum()) if weights is not None else len(y_train),
+        "test_rows": len(y_test),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def print_table(report):
+    print(f"\n📊 {report['train_rows']} train / {report['test_rows']} test rows from '{report['data']}'\n")
+    print(f"{'model':<14}{'accuracy':>9}{'fit ms':>10}{'peak KiB':>10}{'1-row p50 µs':>14}"
+          f"{'1-row p99 µs':>14}{'batch rows/s':>14}{'artifact B':>12}")
+    for r in sorted(report["results"], key=lambda r: -r["accuracy"]):
+        size = r.get("bundle_bytes", r["pickle_bytes"])
+        print(f"{r['model']:<14}{r['accuracy']:>9.2%}{r['fit_ms']:>10.1f}{r['fit_peak_kib']:>10.0f}"
+              f"{r['single']['p50_us']:>14.1f}{r['single']['p99_us']:>14.1f}{r['rows_per_s']:>14,}{size:>12,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark candidate outfit models")
+    parser.add_argument('--data', default='clothing_data.csv')
+    parser.add_argument('--models', nargs='+', choices=list(CANDIDATES), default=list(CANDIDATES))
+    parser.add_argument('--aggregate', action='store_true', help="Count rows chunk by chunk and fit with sample weights")
+    parser.add_argument('--repeat', type=int, default=3, help="Fit/batch timings keep the best of this many runs")
+    parser.add_argument('--single-calls', type=int, default=2000, help="One-row predictions timed per model")
+    parser.add_argument('--out', default=REPORT_PATH)
+    args = parser.parse_args()
+
+    report = benchmark(args.models, args.data, args.aggregate, args.repeat, args.single_calls)
+    print_table(report)
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"\n✅ Report written to '{args.out}'")
@@ -0,0 +1,268 @@
+# benchmark_pipeline.py
+"""
+Latency benchmark for every stage of a recommendation, one call at a time
+and in batches, against a local stub Open-Meteo (see stub_server.py).
+
+    python benchmark_pipeline.py                    # run + report
+    python benchmark_pipeline.py --check            # ... and compare to the baseline
+    python benchmark_pipeline.py --latency 0.05     # slower fake upstream
+    python benchmark_pipeline.py --save-baseline    # accept this run as the new baseline
+
+Each stage reports p50/p95/p99 and ops/sec; a run is written to
+pipeline_benchmark.json. With --check it is compared with
+pipeline_baseline.json, and any stage whose p50 or p95 got slower than the
+tolerance allows fails the run. Every run also times a fixed pure-Python
+reference workload, and the baseline is scaled by how fast that ran here
+relative to the machine the baseline came from, so the check holds on
+faster and slower boxes alike. Re-baseline whenever a change makes a stage
+faster or slower on purpose.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import main
+import weather_module
+from predictor_module import Predictor
+from color_module import get_advanced_color_palette
+from render_module import build_mannequin_svg, get_mannequin_svg
+from stub_server import start_stub_server
+from weather_cache import GeocodeStore
+
+RESULTS_PATH = 'pipeline_benchmark.json'
+BASELINE_PATH = 'pipeline_baseline.json'
+
+# A stage regresses when it is this much slower than the baseline...
+TOLERANCE = 0.5
+# ...and by more than this many microseconds (sub-µs stages are all noise)
+MIN_SLACK_US = 20
+
+EVENTS = ['Casual', 'Office', 'Party', 'Gym', 'Wedding']
+SKINS = ['Light', 'Medium', 'Dark']
+UNDERTONES = ['Cool', 'Warm']
+GENDERS = ['Men', 'Women']
+
+
+def make_workload(n, cities, seed=42):
+    """`n` request records over `cities` distinct (made-up) city names."""
+    rng = random.Random(seed)
+    names = [f"Benchtown {i}" for i in range(cities)]
+    return [
+        {"city": rng.choice(names), "event": rng.choice(EVENTS), "skin_tone": rng.choice(SKINS),
+         "undertone": rng.choice(UNDERTONES), "gender": rng.choice(GENDERS)}
+        for _ in range(n)
+    ]
+
+
+def reset_weather_caches():
+    """Empties the forecast cache and the (in-memory, see benchmark()) geocode store."""
+    weather_module.forecast_cache.clear()
+    weather_module.geocode_store.clear()
+
+
+# --- MEASUREMENT ---
+def reference_us(rounds=25):
+    """
+    Fastest of `rounds` timings, in µs, of a fixed pure-Python workload (dicts,
+    strings, sorting: what the stages are made of). Baselines are compared
+    in multiples of it.
+    """
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        table = {f"city {i}": (i * 7919) % 1000 for i in range(2000)}
+        sorted(table.items(), key=lambda kv: kv[1])
+        "|".join(k.upper() for k in table)
+        samples.append(time.perf_counter() - start)
+    return round(min(samples) * 1e6, 2)
+
+
+def summarize(samples, units=None):
+    """
+    p50/p95/p99 in microseconds per call plus throughput. `units` is how many
+    items each call handled (rows per batch); ops/sec counts those items.
+    """
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+    total = sum(samples)
+    items = units * len(samples) if units else len(samples)
+    return {
+        "calls": len(samples),
+        "p50_us": round(pick(0.50), 2),
+        "p95_us": round(pick(0.95), 2),
+        "p99_us": round(pick(0.99), 2),
+        "ops_per_s": round(items / total) if total else None,
+    }
+
+
+def measure(fn, inputs, units=None, setup=None):
+    """Times fn(*args) for each args in `inputs`; `setup()`, if given, runs untimed before every call."""
+    samples = []
+    for args in inputs:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, units)
+
+
+def run_single(predictor, workload):
+    """Every stage the Streamlit GENERATE LOOK path runs, one request at a time."""
+    stages = {}
+    cities = [(r["city"],) for r in workload]
+    labels = [("Moderate", r["event"], r["skin_tone"]) for r in workload]
+    profiles = [(r["skin_tone"], r["undertone"]) for r in workload]
+
+    # Weather: a fresh lookup per call (geocode + forecast), then straight from the cache
+    stages["weather_cold"] = measure(weather_module.get_weather, cities, setup=reset_weather_caches)
+    for city in set(cities):
+        weather_module.get_weather(*city)
+    stages["weather_warm"] = measure(weather_module.get_weather, cities)
+
+    # Label -> index encoding (what LabelEncoder.transform/safe_transform used to do)
+    stages["encode"] = measure(predictor.resolve_labels, labels)
+    # Table lookup straight to the outfit name (model.predict + inverse_transform)
+    resolved = [predictor.resolve_labels(*l) for l in labels]
+    stages["predict"] = measure(lambda key: predictor.lookup[key], [(k,) for k in resolved])
+
+    stages["palette"] = measure(get_advanced_color_palette, profiles)
+
+    svg_inputs = [(r["gender"], next(iter(get_advanced_color_palette(r["skin_tone"], r["undertone"])["Power"].values())))
+                  for r in workload]
+    get_mannequin_svg.cache_clear()
+    stages["render_svg"] = measure(get_mannequin_svg, svg_inputs)
+    stages["render_svg_uncached"] = measure(build_mannequin_svg, svg_inputs)
+
+    # End to end, starting cold: each city's first request pays for the upstream
+    def recommend(r):
+        weather_cat, _ = weather_module.get_weather(r["city"])
+        predictor.predict_safe(weather_cat, r["event"], r["skin_tone"])
+        palette = get_advanced_color_palette(r["skin_tone"], r["undertone"])
+        get_mannequin_svg(r["gender"], next(iter(palette["Power"].values())))
+
+    reset_weather_caches()
+    get_mannequin_svg.cache_clear()
+    stages["end_to_end"] = measure(recommend, [(r,) for r in workload])
+    return stages
+
+
+def run_batch(predictor, workload, batch_size):
+    """The vectorized paths main.py --batch uses, timed per batch; ops/sec counts rows."""
+    stages = {}
+    batches = [workload[i:i + batch_size] for i in range(0, len(workload), batch_size)]
+    size = len(batches[0])
+
+    def weather_many(batch):
+        weather_module.get_weather_many([r["city"] for r in batch])
+
+    stages["weather_many_cold"] = measure(weather_many, [(b,) for b in batches], units=size, setup=reset_weather_caches)
+
+    columns = [([weather_module.get_weather(r["city"])[0] for r in b], [r["event"] for r in b], [r["skin_tone"] for r in b])
+               for b in batches]
+    predictor.table  # built on first use; keep that one-off out of the timings
+    stages["predict_batch"] = measure(predictor.predict_batch, columns, units=size)
+
+    def end_to_end(batch):
+        for _ in main.recommend_batch(batch, predictor=predictor, chunk_size=batch_size):
+            pass
+
+    stages["recommend_batch"] = measure(end_to_end, [(b,) for b in batches], units=size, setup=reset_weather_caches)
+    return stages
+
+
+def benchmark(requests, cities, batch_size, latency):
+    stub = start_stub_server(latency=latency)
+    weather_module.GEOCODE_URL = f"{stub.url}/v1/search"
+    weather_module.FORECAST_URL = f"{stub.url}/v1/forecast"
+    # Never touch the real on-disk geocode cache
+    weather_module.geocode_store = GeocodeStore(":memory:")
+
+    predictor = Predictor.load()
+    workload = make_workload(requests, cities)
+    try:
+        reference = reference_us()
+        single = run_single(predictor, workload)
+        batch = run_batch(predictor, workload, batch_size)
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "config": {"requests": requests, "cities": cities, "batch_size": batch_size, "stub_latency_s": latency},
+            "model_version": predictor.version,
+            # Timed before and after the stages, so a speed change mid-run shows up
+            "reference_us": min(reference, reference_us()),
+            "single": single,
+            "batch": batch,
+        }
+    finally:
+        stub.shutdown()
+
+
+# --- REPORTING ---
+def print_report(results):
+    for mode in ("single", "batch"):
+        print(f"\n📊 {mode}")
+        print(f"   {'stage':<22}{'p50 µs':>12}{'p95 µs':>12}{'p99 µs':>12}{'ops/s':>14}")
+        for stage, r in results[mode].items():
+            print(f"   {stage:<22}{r['p50_us']:>12,.1f}{r['p95_us']:>12,.1f}{r['p99_us']:>12,.1f}{r['ops_per_s']:>14,}")
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Returns a list of regressions against the baseline (empty if none), scaled to this machine's speed."""
+    failures = []
+    if baseline["config"] != results["config"]:
+        print(f"⚠️  Baseline was recorded with {baseline['config']}; comparing anyway")
+    speed = results["reference_us"] / baseline["reference_us"] if baseline.get("reference_us") else 1.0
+    print(f"\n⚖️  Reference workload {results['reference_us']:,.1f} µs here, "
+          f"{baseline.get('reference_us', 0):,.1f} µs for the baseline: scaling it by {speed:.2f}")
+
+    for mode in ("single", "batch"):
+        for stage, new in results[mode].items():
+            old = baseline.get(mode, {}).get(stage)
+            if old is None:
+                continue
+            for key in ("p50_us", "p95_us"):
+                expected = old[key] * speed
+                if new[key] > expected * (1 + tolerance) and new[key] - expected > MIN_SLACK_US:
+                    failures.append(f"{mode}/{stage} {key}: {new[key]:,.1f} µs vs baseline {expected:,.1f} µs (scaled)")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recommendation pipeline latency benchmark")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests in the generated workload")
+    parser.add_argument('--cities', type=int, default=200, help="Distinct cities in the workload")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds the stub adds to every upstream response")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="Allowed slowdown vs the baseline (0.5 = 50%%)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--out', default=RESULTS_PATH)
+    parser.add_argument('--check', action='store_true', help="Fail if any stage is slower than the baseline allows")
+    parser.add_argument('--save-baseline', action='store_true', help="Write this run as the new baseline")
+    args = parser.parse_args()
+
+    results = benchmark(args.requests, args.cities, args.batch_size, args.latency)
+    print_report(results)
+
+    out_path = args.baseline if args.save_baseline else args.out
+    with open(out_path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    print(f"\n💾 Results written to '{out_path}'")
+    if args.save_baseline or not args.check:
+        sys.exit(0)
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"⚠️  No baseline at '{args.baseline}' (run with --save-baseline to create one)")
+        sys.exit(0)
+
+    failures = compare(results, baseline, args.tolerance)
+    if failures:
+        print("\n❌ Performance regression:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("\n✅ No stage slower than the baseline allows.")
@@ -1,29 +1,95 @@
 # color_module.py
+from types import MappingProxyType
+
+
+def _frozen(mapping):
+    """Read-only view of a dict, with any nested dicts/lists frozen too."""
+    return MappingProxyType({
+        k: _frozen(v) if isinstance(v, dict) else tuple(v) if isinstance(v, list) else v
+        for k, v in mapping.items()
+    })
+
+
+# --- SKIN TONE RULES ---
+# Built once at import; callers share these read-only objects
+SKIN_TONE_RULES = _frozen({
+    "Light": {
+        "Best": ["Navy Blue", "Emerald Green", "Maroon", "Pastel Pink", "Berry"],
+        "Avoid": ["Pale Yellow", "Beige", "White (matches skin too much)"]
+    },
+    "Medium": {
+        "Best": ["Olive Green", "Mustard", "Royal Blue", "Coral", "Teal"],
+        "Avoid": ["Neon Colors", "Grey", "Mauve"]
+    },
+    "Dark": {
+        "Best": ["White", "Cobalt Blue", "Bright Red", "Teal", "Gold", "Pastels"],
+        "Avoid": ["Dark Brown", "Dull Grey", "Black (sometimes)"]
+    }
+})
+
+# Default return if skin tone isn't recognized
+DEFAULT_RULE = _frozen({
+    "Best": ["Black", "White", "Navy"],
+    "Avoid": ["None"]
+})
+
 
 def get_color_recommendation(skin_tone):
     """
     Returns a dictionary of Best and Avoid colors based on skin tone.
     """
     # Standardize input to handle "Light", "light", "LIGHT"
-    skin_tone = skin_tone.capitalize() 
-
-    rules = {
-        "Light": {
-            "Best": ["Navy Blue", "Emerald Green", "Maroon", "Pastel Pink", "Berry"],
-            "Avoid": ["Pale Yellow", "Beige", "White (matches skin too much)"]
-        },
-        "Medium": {
-            "Best": ["Olive Green", "Mustard", "Royal Blue", "Coral", "Teal"],
-            "Avoid": ["Neon Colors", "Grey", "Mauve"]
-        },
-        "Dark": {
-            "Best": ["White", "Cobalt Blue", "Bright Red", "Teal", "Gold", "Pastels"],
-            "Avoid": ["Dark Brown", "Dull Grey", "Black (sometimes)"]
-        }
+    return SKIN_TONE_RULES.get(skin_tone.capitalize(), DEFAULT_RULE)
+
+
+# --- SEASONAL COLOR LOGIC ---
+PALETTES = _frozen({
+    "Winter": {
+        "Season": "Winter ❄",
+        "Desc": "Bold, sharp, high-contrast colors.",
+        "Power": {"Black": "#000000", "White": "#FFFFFF", "Crimson": "#DC143C", "Navy": "#000080", "Royal Blue": "#104E8B", "Emerald": "#50C878"},
+        "Neutrals": ["#808080", "#C0C0C0", "#2F4F4F"],
+        "Avoid": ["#D2691E", "#FFD700", "#F4A460"]
+    },
+    "Summer": {
+        "Season": "Summer ☀",
+        "Desc": "Soft, cool, muted pastels.",
+        "Power": {"Powder Blue": "#B0E0E6", "Lavender": "#E6E6FA", "Rose": "#FFB6C1", "Mint": "#98FB98", "Slate": "#778899", "Steel": "#4682B4"},
+        "Neutrals": ["#F5F5F5", "#708090", "#A9A9A9"],
+        "Avoid": ["#000000", "#FFA500", "#FFFF00"]
+    },
+    "Autumn": {
+        "Season": "Autumn 🍂",
+        "Desc": "Rich, earthy, golden hues.",
+        "Power": {"Olive": "#808000", "Chocolate": "#8B4513", "Gold": "#DAA520", "Brick Red": "#B22222", "Rust": "#D2691E", "Forest": "#556B2F"},
+        "Neutrals": ["#F5F5DC", "#DEB887", "#8B0000"],
+        "Avoid": ["#FF69B4", "#00FFFF", "#E6E6FA"]
+    },
+    "Spring": {
+        "Season": "Spring 🌸",
+        "Desc": "Bright, fresh, vibrant shades.",
+        "Power": {"Coral": "#FF7F50", "Turquoise": "#40E0D0", "Gold": "#FFD700", "Salmon": "#FFA07A", "Aqua": "#7FFFD4", "OrangeRed": "#FF4500"},
+        "Neutrals": ["#FFF8DC", "#F0E68C", "#D2B48C"],
+        "Avoid": ["#000000", "#696969", "#800000"]
     }
-    
-    # Default return if skin tone isn't recognized
-    return rules.get(skin_tone, {
-        "Best": ["Black", "White", "Navy"], 
-        "Avoid": ["None"]
-    })
\ No newline at end of file
+})
+
+
+def get_season(skin_tone, undertone):
+    """Which of the four seasonal palettes a Skin Tone + Undertone belongs to."""
+    if undertone == "Cool" and skin_tone in ["Medium", "Dark"]:
+        return "Winter"
+    elif undertone == "Cool" and skin_tone == "Light":
+        return "Summer"
+    elif undertone == "Warm" and skin_tone in ["Medium", "Dark"]:
+        return "Autumn"
+    else:
+        return "Spring"
+
+
+def get_advanced_color_palette(skin_tone, undertone):
+    """
+    Maps Skin Tone + Undertone to a seasonal palette (Winter/Summer/Autumn/Spring).
+    The palette is shared and read-only.
+    """
+    return PALETTES[get_season(skin_tone, undertone)]
@@ -1,6 +1,10 @@
 # dataset_generator.py
+import argparse
+import os
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-import random
 
 # 1. Define our categories
 weather_conditions = ['Hot', 'Moderate', 'Cold', 'Rainy']
@@ -30,7 +34,7 @@ outfit_rules = {
     ('Cold', 'Party'): ['Leather Jacket + Jeans', 'Velvet Blazer + Trousers', 'Overcoat + Boots'],
     ('Cold', 'Gym'): ['Full Sleeve Dri-Fit + Track Pants', 'Hoodie + Joggers'],
     ('Cold', 'Wedding'): ['Sherwani + Shawl', '3-Piece Suit', 'Velvet Bandhgala'],
-    
+
     # RAINY WEATHER
     ('Rainy', 'Casual'): ['Waterproof Jacket + Shorts', 'Dark T-shirt + Nylon Pants'],
     ('Rainy', 'Office'): ['Dark Shirt + Trousers + Raincoat'],
@@ -39,26 +43,160 @@ outfit_rules = {
     ('Rainy', 'Wedding'): ['Dark Suit (Avoid Velvets)', 'Short Kurta + Trousers']
 }
 
-data = []
-
-# 3. Generate 5000 random samples
-print("Generating synthetic data...")
-for _ in range(5000):
-    weather = random.choice(weather_conditions)
-    event = random.choice(event_types)
-    skin = random.choice(skin_tones)
-    
-    # Select the correct outfit list based on weather and event
-    possible_outfits = outfit_rules.get((weather, event))
-    
-    # Pick one random outfit from that valid list
-    outfit = random.choice(possible_outfits)
-    
-    data.append([weather, event, skin, outfit])
-
-# 4. Save to CSV
-df = pd.DataFrame(data, columns=['Weather', 'Event', 'Skin_Tone', 'Outfit'])
-df.to_csv('clothing_data.csv', index=False)
-
-print("✅ SUCCESS: 'clothing_data.csv' has been created with 5000 rows!")
-print(df.head()) # Show first 5 rows
\ No newline at end of file
+# Every distinct outfit, in first-seen order; rows store indices into this
+all_outfits = list(dict.fromkeys(o for outfits in outfit_rules.values() for o in outfits))
+
+
+def parse_weights(spec, labels):
+    """'Hot=3,Cold=1' -> probabilities over `labels` (unlisted labels weigh 1)."""
+    weights = dict.fromkeys(labels, 1.0)
+    for part in filter(None, (spec or "").split(",")):
+        name, _, value = part.partition("=")
+        if name.strip() not in weights:
+            raise ValueError(f"Unknown label '{name.strip()}' (expected one of {labels})")
+        weights[name.strip()] = float(value)
+    p = np.array([weights[label] for label in labels])
+    return p / p.sum()
+
+
+def build_outfit_cdf(outfit_skew):
+    """
+    Per (weather, event) cell: the outfit indices and the cumulative
+    probability of picking each one. A skew of 0 keeps today's uniform pick;
+    higher values make the first listed outfits Zipf-style favourites.
+    """
+    width = max(len(v) for v in outfit_rules.values())
+    n_cells = len(weather_conditions) * len(event_types)
+    outfit_idx = np.zeros((n_cells, width), dtype=np.int32)
+    cdf = np.ones((n_cells, width))
+
+    for (weather, event), outfits in outfit_rules.items():
+        cell = weather_conditions.index(weather) * len(event_types) + event_types.index(event)
+        weights = 1.0 / np.arange(1, len(outfits) + 1) ** outfit_skew
+        outfit_idx[cell, :len(outfits)] = [all_outfits.index(o) for o in outfits]
+        cdf[cell, :len(outfits)] = np.cumsum(weights / weights.sum())
+        # Rounding can leave the sum just under 1; u below it must still land on a real outfit
+        cdf[cell, len(outfits) - 1] = 1.0
+    return outfit_idx, cdf
+
+
+def generate_chunk(size, seed, weather_p, event_p, skin_p, outfit_skew):
+    """Draws `size` rows in one vectorized pass. Returns a categorical DataFrame."""
+    rng = np.random.default_rng(seed)
+    outfit_idx, cdf = build_outfit_cdf(outfit_skew)
+
+    w = rng.choice(len(weather_conditions), size=size, p=weather_p)
+    e = rng.choice(len(event_types), size=size, p=event_p)
+    s = rng.choice(len(skin_tones), size=size, p=skin_p)
+
+    # Inverse-CDF pick of an outfit inside each row's (weather, event) cell
+    cell = w * len(event_types) + e
+    u = rng.random(size)
+    k = (u[:, None] > cdf[cell]).sum(axis=1)
+    o = outfit_idx[cell, k]
+
+    return pd.DataFrame({
+        'Weather': pd.Categorical.from_codes(w, weather_conditions),
+        'Event': pd.Categorical.from_codes(e, event_types),
+        'Skin_Tone': pd.Categorical.from_codes(s, skin_tones),
+        'Outfit': pd.Categorical.from_codes(o, all_outfits),
+    })
+
+
+def _render_csv_chunk(args):
+    # Runs in a worker: generating *and* formatting the CSV text happen off the main process
+    size, seed, weather_p, event_p, skin_p, outfit_skew, header = args
+    return generate_chunk(size, seed, weather_p, event_p, skin_p, outfit_skew).to_csv(index=False, header=header)
+
+
+def _render_parquet_chunk(args):
+    size, seed, weather_p, event_p, skin_p, outfit_skew, _ = args
+    import pyarrow as pa
+    df = generate_chunk(size, seed, weather_p, event_p, skin_p, outfit_skew)
+    return pa.Table.from_pandas(df.astype(str), preserve_index=False)
+
+
+def generate_dataset(out_path, rows, seed=None, chunk_size=1_000_000, fmt='csv', workers=None,
+                     weather_p=None, event_p=None, skin_p=None, outfit_skew=0.0):
+    """
+    Streams `rows` synthetic rows to `out_path`, `chunk_size` at a time, with
+    chunks generated in parallel. Each chunk gets its own child seed, so the
+    output is identical for a given seed no matter how many workers run.
+    Returns the root seed entropy (log it to reproduce a random run).
+    """
+    root = np.random.SeedSequence(seed)
+    n_chunks = max(1, -(-rows // chunk_size))
+    child_seeds = root.spawn(n_chunks)
+    sizes = [min(chunk_size, rows - i * chunk_size) for i in range(n_chunks)]
+
+    weather_p = weather_p if weather_p is not None else parse_weights(None, weather_conditions)
+    event_p = event_p if event_p is not None else parse_weights(None, event_types)
+    skin_p = skin_p if skin_p is not None else parse_weights(None, skin_tones)
+    jobs = [(size, child, weather_p, event_p, skin_p, outfit_skew, i == 0) for i, (size, child) in enumerate(zip(sizes, child_seeds))]
+
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # fail before any worker starts, not inside one
+        except ImportError as e:
+            raise ImportError("--format parquet needs pyarrow: pip install pyarrow") from e
+
+    workers = workers or os.cpu_count() or 1
+    render = _render_csv_chunk if fmt == 'csv' else _render_parquet_chunk
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Only a couple of chunks per worker are in flight, so memory stays flat
+        window = workers * 2
+        pending = [pool.submit(render, job) for job in jobs[:window]]
+        next_job = len(pending)
+
+        writer = None
+        with open(out_path, 'w', newline='') if fmt == 'csv' else nullcontext() as f:
+            while pending:
+                result = pending.pop(0).result()
+                if next_job < len(jobs):
+                    pending.append(pool.submit(render, jobs[next_job]))
+                    next_job += 1
+
+                if fmt == 'csv':
+                    f.write(result)
+                else:
+                    import pyarrow.parquet as pq
+                    if writer is None:
+                        writer = pq.ParquetWriter(out_path, result.schema)
+                    writer.write_table(result)
+        if writer is not None:
+            writer.close()
+
+    return root.entropy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic clothing dataset generator")
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=None, help="Root seed (default: random, printed for reproducibility)")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="Rows generated and written per chunk")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--out', default=None, help="Output file (default: clothing_data.csv / .parquet)")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel processes (default: all cores)")
+    parser.add_argument('--weather-weights', default=None, help="e.g. 'Hot=3,Rainy=0.5'")
+    parser.add_argument('--event-weights', default=None, help="e.g. 'Wedding=0.2'")
+    parser.add_argument('--skin-weights', default=None, help="e.g. 'Dark=2'")
+    parser.add_argument('--outfit-skew', type=float, default=0.0, help="0 = uniform within a cell, >0 favours the first listed outfits")
+    args = parser.parse_args()
+
+    out_path = args.out or f"clothing_data.{args.format}"
+
+    # 3. Generate the samples, chunk by chunk
+    print("Generating synthetic data...")
+    entropy = generate_dataset(
+        out_path, args.rows, seed=args.seed, chunk_size=args.chunk_size, fmt=args.format, workers=args.workers,
+        weather_p=parse_weights(args.weather_weights, weather_conditions),
+        event_p=parse_weights(args.event_weights, event_types),
+        skin_p=parse_weights(args.skin_weights, skin_tones),
+        outfit_skew=args.outfit_skew
+    )
+
+    # 4. Report
+    print(f"✅ SUCCESS: '{out_path}' has been created with {args.rows} rows! (seed {entropy})")
+    if args.format == 'csv':
+        print(pd.read_csv(out_path, nrows=5)) # Show first 5 rows
@@ -0,0 +1,231 @@
+# gazetteer.py
+"""
+Offline city -> (lat, lon) index, so most geocoding never touches the network.
+
+The index is a plain text file with one place per line, sorted by its
+lookup key:
+
+    key <TAB> name <TAB> country <TAB> latitude <TAB> longitude <TAB> population
+
+It is memory-mapped and binary-searched in place, so workers share the page
+cache and nothing is parsed up front. Build a bigger one from a GeoNames dump:
+
+    python gazetteer.py build cities15000.txt --min-population 15000
+"""
+import argparse
+import difflib
+import mmap
+import os
+import threading
+import unicodedata
+
+GAZETTEER_PATH = os.environ.get("VOGUE_GAZETTEER", "gazetteer.tsv")
+
+
+def gazetteer_key(name):
+    """Lower-cased, accent-free, single-spaced: 'São  Paulo' -> 'sao paulo'."""
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.replace("\t", " ").split()).casefold()
+
+
+def _split_country(city_name):
+    """'Paris, FR' -> ('Paris', 'FR'); country hints are optional."""
+    name, sep, country = str(city_name).rpartition(",")
+    if sep and len(country.strip()) == 2 and country.strip().isalpha():
+        return name, country.strip().upper()
+    return city_name, None
+
+
+class Place:
+    __slots__ = ("key", "name", "country", "latitude", "longitude", "population")
+
+    def __init__(self, line):
+        key, name, country, lat, lon, pop = line.split("\t")
+        self.key = key
+        self.name = name
+        self.country = country
+        self.latitude = float(lat)
+        self.longitude = float(lon)
+        self.population = int(pop)
+
+    def __repr__(self):
+        return f"Place({self.name!r}, {self.country!r}, {self.latitude}, {self.longitude}, pop={self.population})"
+
+
+class Gazetteer:
+    def __init__(self, path=GAZETTEER_PATH):
+        self.path = path
+        self._mm = None
+        self._keys = None  # only built for fuzzy matching
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    # --- LOADING ---
+    def _map(self):
+        if self._mm is None:
+            with self._lock:
+                if self._mm is None:
+                    with open(self.path, "rb") as f:
+                        self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    @property
+    def available(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    # --- BINARY SEARCH OVER THE MAPPED FILE ---
+    def _line_at(self, pos):
+        """Returns (start, end) of the first full line starting at or after `pos`."""
+        mm = self._mm
+        if pos > 0:
+            pos = mm.find(b"\n", pos - 1) + 1
+            if pos == 0:
+                return len(mm), len(mm)
+        end = mm.find(b"\n", pos)
+        return pos, (len(mm) if end == -1 else end)
+
+    def _lower_bound(self, key):
+        """Byte offset of the first line whose key is >= `key`."""
+        mm = self._map()
+        key = key.encode()
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, end = self._line_at(mid)
+            if start >= len(mm):
+                hi = mid
+                continue
+            line_key = mm[start:end].split(b"\t", 1)[0]
+            if line_key < key:
+                lo = end + 1
+            else:
+                hi = mid
+        return self._line_at(lo)[0]
+
+    def _scan(self, pos, match):
+        """Yields places from `pos` onwards while their key satisfies `match`."""
+        mm = self._mm
+        while pos < len(mm):
+            start, end = self._line_at(pos)
+            line = mm[start:end].decode()
+            if not line or not match(line.split("\t", 1)[0]):
+                return
+            yield Place(line)
+            pos = end + 1
+
+    # --- LOOKUPS ---
+    def lookup_all(self, city_name):
+        """Every place with exactly this (normalized) name, most populous first."""
+        if not self.available:
+            return []
+        name, country = _split_country(city_name)
+        key = gazetteer_key(name)
+        if not key:
+            return []
+        places = list(self._scan(self._lower_bound(key), lambda k: k == key))
+        if country:
+            places = [p for p in places if p.country == country]
+        return sorted(places, key=lambda p: -p.population)
+
+    def lookup(self, city_name):
+        """The most populous place with this exact name, or None."""
+        places = self.lookup_all(city_name)
+        if not places:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return places[0]
+
+    def prefix(self, text, limit=10):
+        """Places whose name starts with `text`, most populous first (for autocomplete)."""
+        if not self.available:
+            return []
+        key = gazetteer_key(text)
+        if not key:
+            return []
+        places = list(self._scan(self._lower_bound(key), lambda k: k.startswith(key)))
+        return sorted(places, key=lambda p: -p.population)[:limit]
+
+    def fuzzy(self, city_name, cutoff=0.85):
+        """Best match for a misspelled name ('Pariss' -> Paris), or None."""
+        if not self.available:
+            return None
+        name, country = _split_country(city_name)
+        key = gazetteer_key(name)
+        if not key:
+            return None
+
+        # Only compare against keys that start alike and are about as long
+        candidates = [k for k in self._key_list() if k[0] == key[0] and abs(len(k) - len(key)) <= 2]
+        matches = difflib.get_close_matches(key, candidates, n=1, cutoff=cutoff)
+        if not matches:
+            return None
+        return self.lookup(f"{matches[0]}, {country}" if country else matches[0])
+
+    def _key_list(self):
+        if self._keys is None:
+            mm = self._map()
+            keys = sorted({line.split(b"\t", 1)[0].decode() for line in mm[:].splitlines() if line})
+            self._keys = keys
+        return self._keys
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+
+
+# --- BUILDING THE INDEX ---
+def build_from_geonames(src_path, out_path=GAZETTEER_PATH, min_population=0):
+    """
+    Converts a GeoNames cities dump (cities500/1000/5000/15000.txt) into the
+    sorted index. Both the local name and its ASCII spelling are indexed.
+    """
+    rows = set()
+    with open(src_path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 15:
+                continue
+            name, ascii_name, lat, lon, country, population = cols[1], cols[2], cols[4], cols[5], cols[8], int(cols[14] or 0)
+            if population < min_population:
+                continue
+            for spelling in {name, ascii_name}:
+                key = gazetteer_key(spelling)
+                if key:
+                    rows.add((key, name, country, f"{float(lat):.4f}", f"{float(lon):.4f}", str(population)))
+
+    # Sort on the encoded bytes so the byte-wise binary search agrees with the file order
+    lines = sorted(("\t".join(row) for row in rows), key=lambda l: l.encode())
+    with open(out_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+# Shared index used by weather_module
+gazetteer = Gazetteer()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline city gazetteer")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the index from a GeoNames dump")
+    build.add_argument("source")
+    build.add_argument("--out", default=GAZETTEER_PATH)
+    build.add_argument("--min-population", type=int, default=0)
+
+    find = sub.add_parser("lookup", help="Look a city up")
+    find.add_argument("city")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        count = build_from_geonames(args.source, args.out, args.min_population)
+        print(f"✅ Wrote {count} entries to '{args.out}'")
+    else:
+        place = gazetteer.lookup(args.city) or gazetteer.fuzzy(args.city)
+        print(place if place else f"❌ '{args.city}' is not in the gazetteer")
+        for p in gazetteer.prefix(args.city, limit=5):
+            print(f"   ~ {p}")
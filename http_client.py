@@ -0,0 +1,186 @@
+# http_client.py
+import os
+import random
+import threading
+import time
+
+# --- CLIENT SETTINGS ---
+CONNECT_TIMEOUT = float(os.environ.get("VOGUE_HTTP_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.environ.get("VOGUE_HTTP_READ_TIMEOUT", 10))
+POOL_MAXSIZE = int(os.environ.get("VOGUE_HTTP_POOL_MAXSIZE", 10))  # connections kept per host
+MAX_RETRIES = int(os.environ.get("VOGUE_HTTP_RETRIES", 2))
+BACKOFF_BASE = float(os.environ.get("VOGUE_HTTP_BACKOFF", 0.3))
+BACKOFF_MAX = float(os.environ.get("VOGUE_HTTP_BACKOFF_MAX", 5))
+MAX_CONCURRENCY = int(os.environ.get("VOGUE_HTTP_MAX_CONCURRENCY", 32))
+
+# --- CIRCUIT BREAKER SETTINGS ---
+BREAKER_FAILURES = int(os.environ.get("VOGUE_BREAKER_FAILURES", 5))  # consecutive failures that open it
+BREAKER_COOLDOWN = float(os.environ.get("VOGUE_BREAKER_COOLDOWN", 30))  # seconds before a trial call
+
+# Worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    """
+    A requests.Session with keep-alive connection pooling, connect/read
+    timeouts, retries with jittered exponential backoff and a cap on how
+    many requests may be in flight at once.
+    """
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, pool_maxsize=POOL_MAXSIZE,
+                 retries=MAX_RETRIES, backoff=BACKOFF_BASE, backoff_max=BACKOFF_MAX, max_concurrency=MAX_CONCURRENCY):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+        # requests is only imported once the first client is built (it costs ~100ms)
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._errors = (requests.ConnectionError, requests.Timeout)
+
+        # pool_block makes callers wait for a free connection instead of opening extra ones
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, pool_block=True, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def _sleep_before_retry(self, attempt):
+        # "Full jitter": a random delay up to the exponential ceiling
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt))))
+
+    def get(self, url, params=None, timeout=None):
+        """GET with retries. Returns the final Response or raises the last error."""
+        for attempt in range(self.retries + 1):
+            try:
+                with self._slots:
+                    response = self.session.get(url, params=params, timeout=timeout or self.timeout)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+            except self._errors:
+                if attempt == self.retries:
+                    raise
+            self._sleep_before_retry(attempt)
+
+    def get_json(self, url, params=None, timeout=None):
+        """GET and decode JSON, raising on HTTP errors."""
+        response = self.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+def is_upstream_failure(error):
+    """
+    True if an error says the upstream is unwell: it couldn't be reached,
+    timed out, answered 5xx or throttled us (429). Other 4xx answers are about
+    the request, not the upstream, and shouldn't open a breaker shared by everyone.
+    """
+    response = getattr(error, "response", None)
+    if response is not None:
+        return response.status_code in RETRY_STATUSES or response.status_code >= 500
+    import requests
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing upstream. After `failures` consecutive errors the
+    breaker opens and calls fail immediately; after `cooldown` seconds one
+    trial call is let through (half-open), which closes it again on success
+    or re-opens it on failure. Only errors `is_failure` accepts count; any
+    other error passes through and leaves the breaker as it was.
+    """
+
+    def __init__(self, name, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN, is_failure=is_upstream_failure):
+        self.name = name
+        self.failures = failures
+        self.cooldown = cooldown
+        self.is_failure = is_failure
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self._trial or time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self):
+        """True if a call may go out now (claiming the trial slot when half-open)."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print(f"✅ Circuit '{self.name}' closed")
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._trial or (self.opened_at is None and self.consecutive_failures >= self.failures):
+                if self.opened_at is None:
+                    print(f"⚡ Circuit '{self.name}' open after {self.consecutive_failures} failures")
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+    def release_trial(self):
+        """Frees the half-open trial slot without deciding anything, so the next call can be the trial."""
+        with self._lock:
+            self._trial = False
+
+    def call(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) through the breaker; raises CircuitOpenError without calling it when open."""
+        if not self.allow():
+            raise CircuitOpenError(f"circuit '{self.name}' is open")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.release_trial()
+            raise
+        self.record_success()
+        return result
+
+
+# Shared client: one connection pool per process, built on first use
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+def get(url, params=None, timeout=None):
+    return get_client().get(url, params=params, timeout=timeout)
+
+def get_json(url, params=None, timeout=None):
+    return get_client().get_json(url, params=params, timeout=timeout)
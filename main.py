@@ -1,51 +1,165 @@
 # main.py
-import joblib
+import argparse
+import json
 import warnings
-from weather_module import get_weather
-from color_module import get_color_recommendation
+from itertools import islice
+from predictor_module import Predictor, FALLBACK_OUTFIT
+from weather_module import get_weather, get_weather_many_tagged, get_weather_tagged
+from color_module import get_color_recommendation, get_advanced_color_palette
+
+# Rows are pulled from the input stream and scored this many at a time
+BATCH_CHUNK_SIZE = 10000
 
 # Suppress warnings to keep the output clean
 warnings.filterwarnings("ignore")
 
 def load_resources():
-    """Load the trained model and encoders."""
+    """Load the compiled outfit predictor."""
     try:
         print("⏳ Loading AI Brain...")
-        model = joblib.load('model.pkl')
-        le_weather = joblib.load('le_weather.pkl')
-        le_event = joblib.load('le_event.pkl')
-        le_skin = joblib.load('le_skin.pkl')
-        le_outfit = joblib.load('le_outfit.pkl')
+        predictor = Predictor.load()
         print("✅ System Ready!")
-        return model, le_weather, le_event, le_skin, le_outfit
+        return predictor
     except FileNotFoundError:
         print("❌ Error: Model files not found. Please run 'train_model.py' first.")
         exit()
+    except ValueError as e:
+        print(f"❌ Error: {e}. Please re-run 'train_model.py'.")
+        exit()
 
-def get_outfit_prediction(model, le_weather, le_event, le_skin, le_outfit, weather, event, skin):
+def get_outfit_prediction(predictor, weather, event, skin):
     """
-    Encodes inputs, predicts using the ML model, and decodes the output.
+    Looks up the outfit for the given context in the compiled table.
     """
-    try:
-        # Transform inputs into numbers (using the saved encoders)
-        # Note: We need to handle cases where the input might not match training data exactly
-        w_encoded = le_weather.transform([weather])[0]
-        e_encoded = le_event.transform([event])[0]
-        s_encoded = le_skin.transform([skin])[0]
-
-        # Predict
-        prediction_idx = model.predict([[w_encoded, e_encoded, s_encoded]])
-        
-        # Convert number back to text
-        outfit_name = le_outfit.inverse_transform(prediction_idx)[0]
-        return outfit_name
-    except ValueError as e:
-        # Fallback if the specific combination/label wasn't seen in training
-        return "Standard Smart Casual (Blue Jeans + White Shirt)"
+    # Fallback if the specific combination/label wasn't seen in training
+    return predictor.predict(weather, event, skin, default=FALLBACK_OUTFIT)
+
+def normalize_request(row):
+    """(city, event, skin_tone, undertone) from a request record, cleaned the way main() cleans input()."""
+    return (
+        str(row.get('city', '')).strip(),
+        str(row.get('event', '')).strip().capitalize(),
+        str(row.get('skin_tone', '')).strip().capitalize(),
+        str(row.get('undertone', '')).strip().capitalize()
+    )
+
+def format_recommendation(row, city, event, skin, undertone, weather_cat, temp, outfit, palette, freshness=None):
+    """The JSON record batch mode writes (and the HTTP service returns) for one request."""
+    result = {
+        "city": city, "event": event, "skin_tone": skin,
+        "undertone": undertone, "gender": row.get('gender'),
+        "weather": weather_cat, "temp": temp, "outfit": outfit,
+        "season": palette['Season'], "power_colors": dict(palette['Power']),
+        "avoid_colors": list(palette['Avoid'])
+    }
+    if freshness is not None:
+        result["weather_freshness"] = freshness
+    return result
+
+def format_look(row, city, event, skin, undertone, weather_cat, temp, look, freshness=None):
+    """format_recommendation's record, with the model-dependent fields copied out of a cached Look."""
+    fields = look.fields
+    result = {
+        "city": city, "event": event, "skin_tone": skin,
+        "undertone": undertone, "gender": row.get('gender'),
+        "weather": weather_cat, "temp": temp, "outfit": fields["outfit"], "season": fields["season"],
+        "power_colors": dict(fields["power_colors"]), "avoid_colors": list(fields["avoid_colors"])
+    }
+    if freshness is not None:
+        result["weather_freshness"] = freshness
+    return result
+
+def recommend_one(row, predictor):
+    """One request record -> one recommendation: a weather lookup, then a response cache lookup."""
+    from response_cache import for_predictor
+
+    city, event, skin, undertone = normalize_request(row)
+    weather_cat, temp, freshness = get_weather_tagged(city)
+    look = for_predictor(predictor).lookup(weather_cat, event, skin, undertone, row.get('gender'))
+    return format_look(row, city, event, skin, undertone, weather_cat, temp, look, freshness)
+
+def recommend_batch(rows, predictor=None, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Yields one recommendation per (city, event, skin_tone, undertone, gender) record.
+    Weather is fetched once per distinct city and every chunk of rows is
+    encoded and predicted in a single vectorized pass.
+    """
+    if predictor is None:
+        predictor = load_resources()
+
+    weather_by_city = {}
+    palette_by_profile = {}
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        # 1. Normalize the columns the same way main() normalizes input()
+        cities, events, skins, undertones = zip(*map(normalize_request, chunk))
+
+        # 2. One weather lookup per city we haven't seen yet, resolved concurrently
+        new_cities = list(set(cities) - weather_by_city.keys())
+        weather_by_city.update(zip(new_cities, get_weather_many_tagged(new_cities)))
+        weathers = [weather_by_city[city][0] for city in cities]
+
+        # 3. Predict the whole chunk at once
+        outfits = predictor.predict_batch(weathers, events, skins, default=FALLBACK_OUTFIT)
+
+        # 4. Assemble the results
+        for row, city, event, skin, undertone, outfit in zip(chunk, cities, events, skins, undertones, outfits):
+            weather_cat, temp, freshness = weather_by_city[city]
+            profile = (skin, undertone)
+            if profile not in palette_by_profile:
+                palette_by_profile[profile] = get_advanced_color_palette(skin, undertone)
+            palette = palette_by_profile[profile]
+
+            yield format_recommendation(row, city, event, skin, undertone, weather_cat, temp, outfit, palette, freshness)
+
+def read_jsonl(path):
+    """Streams records from a JSON Lines file, skipping blank lines."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def run_batch(in_path, out_path):
+    """Reads requests from `in_path` and writes recommendations to `out_path` as they are produced."""
+    count = 0
+    with open(out_path, 'w', encoding='utf-8') as out:
+        for result in recommend_batch(read_jsonl(in_path)):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            count += 1
+    print(f"✅ Wrote {count} recommendations to '{out_path}'")
+
+def run_plan(city, event, skin, undertone, days):
+    """Prints a day-by-day outfit plan for the forecast horizon (see planner_module.py)."""
+    from planner_module import plan_outfits  # NumPy only on this path
+
+    predictor = load_resources()
+    print(f"\n🌍 Fetching the {days}-day forecast for {city}...")
+    plan = plan_outfits(predictor, city, event.strip().capitalize(), skin.strip().capitalize(),
+                        undertone.strip().capitalize(), days)
+    if not plan['forecast']:
+        print("   -> Forecast unavailable, planning for 'Moderate' weather")
+
+    print("\n" + "="*50)
+    print(f"🗓️  YOUR {len(plan['days'])}-DAY PLAN | {plan['event']} | {plan['season']}")
+    print("="*50)
+    for day in plan['days']:
+        print(f"📅  {day['date']}  {day['weather']} ({day['temp_min']}–{day['temp_max']}°C)")
+        print(f"    🧥  {day['outfit']}")
+        for part in day['dayparts']:
+            if part['outfit'] != day['outfit']:
+                print(f"    ↳ {part['daypart']}: {part['weather']} ({part['temp']}°C) -> {part['outfit']}")
+    print("-" * 50)
+    print(f"✅  Power Colors:  {', '.join(plan['power_colors'])}")
+    print("="*50 + "\n")
 
 def main():
     # 1. Load Resources
-    model, le_weather, le_event, le_skin, le_outfit = load_resources()
+    predictor = load_resources()
 
     print("\n" + "="*50)
     print("👔 SMART CLOTHING RECOMMENDATION SYSTEM 👗")
@@ -70,7 +184,7 @@ def main():
 
     # 5. Get ML Outfit Recommendation
     print("🧠 AI is thinking...")
-    final_outfit = get_outfit_prediction(model, le_weather, le_event, le_skin, le_outfit, weather_cat, event, skin)
+    final_outfit = get_outfit_prediction(predictor, weather_cat, event, skin)
 
     # 6. Final Output Display
     print("\n" + "="*50)
@@ -84,4 +198,19 @@ def main():
     print("="*50 + "\n")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Smart Clothing Recommendation System")
+    parser.add_argument('--batch', metavar='IN', help="JSONL file of {city, event, skin_tone, undertone, gender} records")
+    parser.add_argument('--out', metavar='OUT', default='recommendations.jsonl', help="Where to write batch results")
+    parser.add_argument('--plan', metavar='CITY', help="Plan outfits for every day of the forecast in CITY")
+    parser.add_argument('--days', type=int, default=7, help="Days to plan with --plan (1-16)")
+    parser.add_argument('--event', default='Casual', help="Event type for --plan")
+    parser.add_argument('--skin-tone', default='Medium', help="Skin tone for --plan")
+    parser.add_argument('--undertone', default='Warm', help="Undertone for --plan")
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(args.batch, args.out)
+    elif args.plan:
+        run_plan(args.plan, args.event, args.skin_tone, args.undertone, args.days)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,237 @@
+# memory_check.py
+"""
+Memory regression check for long-lived app.py workers. Drives the app
+headlessly with Streamlit's testing API (AppTest) through thousands of
+scripted interactions: generate a look for a random profile, switch palette
+colors, open the decision tree, and every so often start a new session. It
+samples RSS along the way, diffs tracemalloc snapshots taken after warm-up
+and at the end, and fails if memory grows faster per rerun than
+memory_budget.json allows.
+
+    python memory_check.py                      # check against memory_budget.json
+    python memory_check.py --interactions 5000  # a longer soak
+    python memory_check.py --update             # re-baseline the budget on this machine
+
+Weather comes from the local stub server, assets are never fetched and the
+GENERATE LOOK pause is skipped, so only the app's own memory is measured.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+BUDGET_PATH = 'memory_budget.json'
+
+# Budgets are re-baselined to this multiple of the measured growth, plus a floor
+# so a near-zero measurement doesn't leave a budget nothing could meet
+HEADROOM = 2.0
+FLOOR_BYTES = {"traced_bytes_per_rerun": 256, "rss_bytes_per_rerun": 4096}
+
+CITIES = ["Paris", "Mumbai", "Oslo", "Lima", "Cairo", "Tokyo", "Sydney", "Toronto", "Benchtown 1", "Benchtown 2"]
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def slope(points):
+    """Least-squares slope of [(x, y), ...]."""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var if var else 0.0
+
+
+# --- DRIVING THE APP ---
+class Driver:
+    """One scripted user at a time against app.py; counts every rerun it causes."""
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.reruns = 0
+        self.at = None
+
+    def new_session(self):
+        from streamlit.testing.v1 import AppTest
+        # AppTest runs bare; the warning it logs about the missing run context is expected
+        logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+        self.at = AppTest.from_file("app.py", default_timeout=60)
+        self._run(self.at)
+
+    def _run(self, element):
+        element.run()
+        self.reruns += 1
+        if self.at.exception:
+            raise RuntimeError(f"app.py raised: {self.at.exception[0].message}")
+
+    def _pick(self, widget_list, label):
+        widget = next(w for w in widget_list if w.label == label)
+        return widget, self.random.choice(widget.options)
+
+    def interact(self):
+        """One user turn: a new profile + GENERATE LOOK, a couple of colors, sometimes the tree."""
+        at = self.at
+        at.text_input[0].set_value(self.random.choice(CITIES))
+        for label in ("📅 Occasion", "🎨 Skin Tone", "🌡 Undertone"):
+            box, value = self._pick(at.selectbox, label)
+            box.set_value(value)
+        radio, value = self._pick(at.radio, "Gender")
+        radio.set_value(value)
+        self._run(at.button[0].click())
+
+        for _ in range(2):
+            radio, value = self._pick(at.radio, "Select Color")
+            self._run(radio.set_value(value))
+
+        if self.random.random() < 0.25:
+            self._run(at.toggle[0].set_value(True))
+            self._run(at.toggle[0].set_value(False))
+
+
+# --- MEASURING ---
+def run(interactions, warmup, session_every, sample_every, top, seed):
+    driver = Driver(seed)
+    driver.new_session()
+
+    # 1. Warm up: fill the model, palette, SVG and tree caches (and go through
+    #    one session switch) before measuring
+    for i in range(warmup):
+        driver.interact()
+    driver.new_session()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start_reruns, start_rss = driver.reruns, rss_bytes()
+    samples = [(0, start_rss)]
+    started = time.perf_counter()
+
+    # 2. The soak, with a fresh session every `session_every` interactions
+    for i in range(1, interactions + 1):
+        if session_every and i % session_every == 0:
+            driver.new_session()
+        driver.interact()
+        if i % sample_every == 0:
+            samples.append((driver.reruns - start_reruns, rss_bytes()))
+
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    traced_now, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    elapsed = time.perf_counter() - started
+
+    # 3. Growth per rerun, and which lines it came from
+    reruns = driver.reruns - start_reruns
+    stats = after.compare_to(before, "lineno")
+    traced_growth = sum(s.size_diff for s in stats)
+    growth_by_line = [
+        {"line": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "size_diff": s.size_diff, "count_diff": s.count_diff}
+        for s in stats[:top] if s.size_diff > 0
+    ]
+
+    return {
+        "interactions": interactions,
+        "reruns": reruns,
+        "elapsed_s": round(elapsed, 1),
+        "rss_start_bytes": start_rss,
+        "rss_end_bytes": samples[-1][1],
+        "rss_bytes_per_rerun": round(slope(samples), 1),
+        "traced_growth_bytes": traced_growth,
+        "traced_bytes_per_rerun": round(traced_growth / reruns, 1) if reruns else 0.0,
+        "traced_peak_bytes": traced_peak,
+        "rss_samples": samples,
+        "top_growth": growth_by_line,
+    }
+
+
+def print_report(report):
+    mb = lambda b: f"{b / 1024 ** 2:.1f} MiB"
+    print(f"\n🧠 {report['interactions']} interactions, {report['reruns']} reruns in {report['elapsed_s']} s")
+    print(f"   RSS      {mb(report['rss_start_bytes'])} -> {mb(report['rss_end_bytes'])}"
+          f"  ({report['rss_bytes_per_rerun']:+.0f} B/rerun by regression)")
+    print(f"   traced   {report['traced_growth_bytes'] / 1024:+.1f} KiB"
+          f"  ({report['traced_bytes_per_rerun']:+.1f} B/rerun), peak {mb(report['traced_peak_bytes'])}")
+    if report["top_growth"]:
+        print("\n   top growth by line")
+        for s in report["top_growth"]:
+            print(f"   {s['size_diff'] / 1024:+9.1f} KiB  {s['count_diff']:+7d} blocks  {s['line']}")
+
+
+def check(report, budget):
+    failures = []
+    for key, limit in budget.items():
+        if report[key] > limit:
+            failures.append(f"{key}: {report[key]:.1f} B, budget is {limit} B")
+    return failures
+
+
+def start_environment():
+    """Offline weather, no asset fetches, no spinner pause; set before app.py is first imported."""
+    from stub_server import start_stub_server
+    stub = start_stub_server()
+    os.environ.update({
+        "VOGUE_GEOCODE_URL": f"{stub.url}/v1/search",
+        "VOGUE_FORECAST_URL": f"{stub.url}/v1/forecast",
+        "VOGUE_GEOCODE_DB": ":memory:",
+        "VOGUE_ASSETS_OFFLINE": "1",
+        "VOGUE_SPINNER_DELAY": "0",
+    })
+    return stub
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streamlit rerun memory regression check")
+    parser.add_argument("--interactions", type=int, default=1000, help="Scripted user turns to measure")
+    parser.add_argument("--warmup", type=int, default=50, help="Turns before measuring starts")
+    parser.add_argument("--session-every", type=int, default=100, help="Start a new session every N turns (0: never)")
+    parser.add_argument("--sample-every", type=int, default=10, help="Sample RSS every N turns")
+    parser.add_argument("--top", type=int, default=10, help="Lines to list in the growth report")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--update", action="store_true", help="Rewrite the budget from this run (baseline at the default length)")
+    parser.add_argument("--out", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    import warnings
+    warnings.filterwarnings("ignore")
+
+    start_environment()
+    report = run(args.interactions, args.warmup, args.session_every, args.sample_every, args.top, args.seed)
+    print_report(report)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Report written to '{args.out}'")
+
+    if args.update:
+        budget = {key: int(max(report[key], 0) * HEADROOM) + FLOOR_BYTES[key] for key in FLOOR_BYTES}
+        with open(BUDGET_PATH, "w") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"\n📏 Budget written to '{BUDGET_PATH}': " + ", ".join(f"{k} {v} B" for k, v in budget.items()))
+        sys.exit(0)
+
+    with open(BUDGET_PATH) as f:
+        failures = check(report, json.load(f))
+    if failures:
+        print("\n❌ Memory budget exceeded:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("\n✅ Memory growth per rerun within budget.")
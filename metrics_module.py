@@ -0,0 +1,221 @@
+# metrics_module.py
+"""
+Per-stage timing and counters, exported as Prometheus text and/or one JSON
+log line per event. Everything is off unless configured:
+
+    VOGUE_METRICS=1        record spans + counters (served at /metrics)
+    VOGUE_METRICS_LOG=1    also log each span/counter as a JSON line on stderr
+    VOGUE_METRICS_PORT=N   serve /metrics on port N from a background thread
+                           (for processes without their own HTTP server, e.g. the Streamlit app)
+
+When disabled, span() hands back one shared no-op object and timed()
+returns the function untouched, so instrumented code pays next to nothing.
+"""
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("VOGUE_METRICS", "0") == "1" or os.environ.get("VOGUE_METRICS_LOG", "0") == "1"
+JSON_LOGS = os.environ.get("VOGUE_METRICS_LOG", "0") == "1"
+METRICS_PORT = int(os.environ.get("VOGUE_METRICS_PORT", 0))
+
+# Upper bounds (seconds) of the stage duration histogram
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+STAGE_SECONDS = "vogue_stage_duration_seconds"
+STAGE_ERRORS = "vogue_stage_errors_total"
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+_logger = None
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _log(event, **fields):
+    global _logger
+    if _logger is None:
+        import logging
+        _logger = logging.getLogger("vogue.metrics")
+        if not _logger.handlers:
+            _logger.addHandler(logging.StreamHandler())
+            _logger.setLevel(logging.INFO)
+            _logger.propagate = False
+    _logger.info(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str))
+
+
+# --- RECORDING ---
+def inc(name, amount=1, **labels):
+    """Adds `amount` to a counter (e.g. inc("vogue_weather_fallbacks_total", reason="not_found"))."""
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+    if JSON_LOGS:
+        _log("counter", name=name, amount=amount, **labels)
+
+
+def observe(name, seconds, **labels):
+    """Records one duration in a histogram."""
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+                break
+        h[-2] += seconds
+        h[-1] += 1
+
+
+class Span:
+    """Times a `with` block as one stage; an exception also bumps the stage's error counter."""
+
+    __slots__ = ("stage", "labels", "start")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        observe(STAGE_SECONDS, elapsed, stage=self.stage, **self.labels)
+        if exc_type is not None:
+            inc(STAGE_ERRORS, stage=self.stage, error=exc_type.__name__, **self.labels)
+        if JSON_LOGS:
+            _log("span", stage=self.stage, duration_ms=round(elapsed * 1e3, 3),
+                 status="ok" if exc_type is None else "error", **self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage, **labels):
+    """`with span("forecast"): ...` times the block when metrics are on."""
+    return Span(stage, labels) if ENABLED else _NOOP
+
+
+def timed(stage):
+    """Decorator form of span(); a no-op (the original function) when metrics are off."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        def wrapper(*args, **kwargs):
+            with Span(stage, {}):
+                return fn(*args, **kwargs)
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__qualname__ = getattr(fn, "__qualname__", fn.__name__)
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        # Keep lru_cache controls reachable through the wrapper
+        for attr in ("cache_clear", "cache_info"):
+            if hasattr(fn, attr):
+                setattr(wrapper, attr, getattr(fn, attr))
+        return wrapper
+    return decorate
+
+
+# --- EXPORT ---
+def _escape_label(value):
+    # The text format escapes backslash, double quote and newline in label values
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def render_prometheus():
+    """Every counter and histogram in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+
+    lines = []
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for name in sorted({n for n, _ in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (n, labels), h in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, h):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {h[-2]:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {h[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Forgets everything recorded so far."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+_server = None
+
+
+def start_http_server(port=METRICS_PORT, host="0.0.0.0"):
+    """Serves /metrics from a daemon thread (once per process). Returns the server, or None if no port."""
+    global _server
+    if not port:
+        return None
+    with _lock:
+        if _server is not None:
+            return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                found = self.path.split("?")[0] == "/metrics"
+                body = render_prometheus().encode() if found else b""
+                self.send_response(200 if found else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
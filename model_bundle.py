@@ -0,0 +1,283 @@
+# model_bundle.py
+"""
+One self-describing file for the trained model and its vocabularies.
+
+    MAGIC (8 bytes) | header length (uint32 LE) | JSON header | padding | raw arrays
+
+The JSON header carries the schema version, the label vocabularies, a
+content hash and the type/length/offset of every tree array. The arrays are
+plain little-endian int32/float64 blocks read straight out of a memory map,
+so loading needs neither unpickling nor NumPy, and the vocabularies can never
+drift from the tree they were trained with.
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import time
+from array import array
+
+MODEL_PATH = 'model.bundle'
+
+# Every bundle train_model.py writes is copied here, for rollbacks (see model_registry.py)
+ARCHIVE_DIR = os.environ.get("VOGUE_MODEL_ARCHIVE", "model_archive")
+ARCHIVE_KEEP = int(os.environ.get("VOGUE_MODEL_KEEP", 3))  # newest versions kept in the archive
+
+MAGIC = b"VOGUEML\x00"
+SCHEMA_VERSION = 1
+
+FEATURES = ["weather", "event", "skin"]
+FEATURE_NAMES = ["Weather", "Event", "Skin"]
+
+# name -> array typecode ('i' = int32, 'd' = float64)
+TREE_ARRAYS = {
+    "children_left": "i",
+    "children_right": "i",
+    "feature": "i",
+    "threshold": "d",
+    "node_class": "i",      # outfit vocabulary index predicted at each node
+    "n_node_samples": "i",
+    "impurity": "d",
+}
+
+
+class TreeArrays:
+    """Read-only views of the tree, with the same names sklearn's Tree uses."""
+
+    def __init__(self, arrays):
+        for name, values in arrays.items():
+            setattr(self, name, values)
+        self.node_count = len(arrays["children_left"])
+
+
+class ModelBundle:
+    def __init__(self, header, arrays, buffer=None):
+        self.header = header
+        self.vocabularies = header["vocabularies"]
+        self.content_hash = header["content_hash"]
+        self.schema_version = header["schema_version"]
+        self.tree = TreeArrays(arrays)
+        self._buffer = buffer  # keeps the memory map alive
+
+    @property
+    def version(self):
+        """Short id for logs, caches and the UI."""
+        return self.content_hash[:16]
+
+    def predict_indices(self, x):
+        """Walks the tree for one encoded (weather, event, skin) row; returns the outfit index."""
+        t = self.tree
+        node = 0
+        while t.children_left[node] != t.children_right[node]:
+            if x[t.feature[node]] <= t.threshold[node]:
+                node = t.children_left[node]
+            else:
+                node = t.children_right[node]
+        return t.node_class[node]
+
+    def close(self):
+        # Drop our views first; the map can't close while they're exported
+        self.tree = None
+        if self._buffer is not None:
+            _close_quietly(self._buffer)
+            self._buffer = None
+
+
+def _close_quietly(buffer):
+    try:
+        buffer.close()
+    except BufferError:
+        pass  # someone still holds a view; the map is freed when they let go
+
+
+def _content_hash(vocabularies, blobs):
+    digest = hashlib.sha256()
+    digest.update(json.dumps(vocabularies, sort_keys=True).encode())
+    for name in TREE_ARRAYS:
+        digest.update(blobs[name])
+    return digest.hexdigest()
+
+
+# --- WRITING ---
+def write_bundle(path, vocabularies, arrays, extra=None):
+    """
+    Writes the bundle atomically (temp file + rename), so readers never see a
+    half-written model. `arrays` maps every TREE_ARRAYS name to a sequence.
+    """
+    blobs = {}
+    for name, code in TREE_ARRAYS.items():
+        a = array(code, arrays[name])
+        if sys.byteorder != "little":
+            a.byteswap()
+        blobs[name] = a.tobytes()
+
+    header = {
+        "schema_version": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "features": FEATURES,
+        "vocabularies": {k: list(v) for k, v in vocabularies.items()},
+        "content_hash": "",
+        "arrays": {},
+    }
+    header.update(extra or {})
+    header["content_hash"] = _content_hash(header["vocabularies"], blobs)
+
+    # Offsets are relative to the start of the data section; every array starts 8-byte aligned
+    offset = 0
+    for name, code in TREE_ARRAYS.items():
+        header["arrays"][name] = {"type": code, "length": len(blobs[name]) // array(code).itemsize, "offset": offset}
+        offset += len(blobs[name]) + (-len(blobs[name]) % 8)
+
+    header_bytes = json.dumps(header).encode()
+    prefix_len = len(MAGIC) + 4 + len(header_bytes)
+    padding = b"\x00" * (-prefix_len % 8)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(padding)
+        for name in TREE_ARRAYS:
+            f.write(blobs[name])
+            f.write(b"\x00" * (-len(blobs[name]) % 8))
+    os.replace(tmp_path, path)
+    return header
+
+
+def bundle_from_sklearn(model, le_weather, le_event, le_skin, le_outfit):
+    """Pulls the tree arrays + vocabularies out of a fitted sklearn model and its encoders."""
+    t = model.tree_
+    # value[node] is a distribution over model.classes_, which are encoded outfit ids
+    node_class = [int(model.classes_[v.argmax()]) for v in t.value[:, 0, :]]
+    vocabularies = {
+        "weather": [str(c) for c in le_weather.classes_],
+        "event": [str(c) for c in le_event.classes_],
+        "skin": [str(c) for c in le_skin.classes_],
+        "outfit": [str(c) for c in le_outfit.classes_],
+    }
+    arrays = {
+        "children_left": t.children_left.tolist(),
+        "children_right": t.children_right.tolist(),
+        "feature": t.feature.tolist(),
+        "threshold": t.threshold.tolist(),
+        "node_class": node_class,
+        # Weighted, so a model fit on aggregated counts reports real row counts
+        "n_node_samples": [int(round(w)) for w in t.weighted_n_node_samples],
+        "impurity": t.impurity.tolist(),
+    }
+    return vocabularies, arrays
+
+
+# --- READING ---
+def load_bundle(path=MODEL_PATH, verify=True):
+    """
+    Memory-maps a bundle and returns a ModelBundle. Raises ValueError if the
+    file isn't a bundle, has an unknown schema or fails its content hash.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path}' is not a model bundle")
+        (header_len,) = struct.unpack_from("<I", buffer, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(buffer[header_start:header_start + header_len])
+
+        if header.get("schema_version") != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported model bundle schema {header.get('schema_version')} (expected {SCHEMA_VERSION})")
+
+        data_start = header_start + header_len
+        data_start += -data_start % 8
+        view = memoryview(buffer)
+
+        arrays, blobs = {}, {}
+        for name in TREE_ARRAYS:
+            spec = header["arrays"][name]
+            size = spec["length"] * array(spec["type"]).itemsize
+            start = data_start + spec["offset"]
+            blob = view[start:start + size]
+            blobs[name] = blob
+            if sys.byteorder == "little":
+                arrays[name] = blob.cast(spec["type"])
+            else:
+                swapped = array(spec["type"], blob.tobytes())
+                swapped.byteswap()
+                arrays[name] = swapped
+
+        if verify and _content_hash(header["vocabularies"], blobs) != header["content_hash"]:
+            raise ValueError(f"'{path}' failed its content hash check")
+
+        del blobs, view
+        return ModelBundle(header, arrays, buffer)
+    except Exception:
+        _close_quietly(buffer)
+        raise
+
+
+def migrate_pickles(path=MODEL_PATH):
+    """Converts the legacy model.pkl + le_*.pkl files into a bundle."""
+    import joblib
+
+    vocabularies, arrays = bundle_from_sklearn(
+        joblib.load('model.pkl'),
+        joblib.load('le_weather.pkl'),
+        joblib.load('le_event.pkl'),
+        joblib.load('le_skin.pkl'),
+        joblib.load('le_outfit.pkl')
+    )
+    return write_bundle(path, vocabularies, arrays)
+
+
+# --- ARCHIVE ---
+def archive_path(version):
+    return os.path.join(ARCHIVE_DIR, f"{version}.bundle")
+
+
+def archive(path=MODEL_PATH, keep=ARCHIVE_KEEP):
+    """Copies a bundle into the archive and prunes it to the newest `keep`. Returns the version."""
+    bundle = load_bundle(path)
+    version = bundle.version
+    bundle.close()
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    target = archive_path(version)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    shutil.copyfile(path, tmp_path)
+    os.replace(tmp_path, target)
+    os.utime(target)  # newest by mtime, even when re-archiving an old version
+
+    for old in list_archive()[keep:]:
+        os.remove(archive_path(old))
+    return version
+
+
+def list_archive():
+    """Archived versions, newest first."""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    files = [f for f in os.listdir(ARCHIVE_DIR) if f.endswith(".bundle")]
+    files.sort(key=lambda f: os.path.getmtime(os.path.join(ARCHIVE_DIR, f)), reverse=True)
+    return [f[:-len(".bundle")] for f in files]
+
+
+def restore(version, path=MODEL_PATH):
+    """Atomically puts an archived version back at `path`; every watching process picks it up."""
+    load_bundle(archive_path(version)).close()  # never restore a corrupt file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.copyfile(archive_path(version), tmp_path)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["migrate"]:
+        header = migrate_pickles()
+        print(f"✅ Wrote '{MODEL_PATH}' (version {header['content_hash'][:16]})")
+    else:
+        bundle = load_bundle(sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH)
+        print(f"📦 Model bundle v{bundle.schema_version}, version {bundle.version}, created {bundle.header['created']}")
+        print(f"   {bundle.tree.node_count} nodes, " + ", ".join(f"{len(v)} {k}s" for k, v in bundle.vocabularies.items()))
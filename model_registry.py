@@ -0,0 +1,199 @@
+# model_registry.py
+"""
+Hot-reloading model registry. A background thread watches the model bundle;
+when train_model.py replaces it, the new version is loaded, verified and
+compiled off the request path and then swapped in with a single assignment.
+Requests already holding the old Predictor finish on it; new ones get the
+new one. No restart, no half-loaded model.
+
+    registry = ModelRegistry().start()
+    predictor = registry.current          # grab once per request
+
+The last VOGUE_MODEL_KEEP versions stay compiled in memory, so switching back
+to one of them (rollback, or the file being restored) is instant. Every
+bundle train_model.py writes is also archived, so a rollback can be pushed
+to every process at once by restoring the file:
+
+    python model_registry.py list
+    python model_registry.py rollback [VERSION]    # default: the one before the current
+"""
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from model_bundle import ARCHIVE_DIR, ARCHIVE_KEEP, MODEL_PATH, archive_path, list_archive, load_bundle, restore
+from predictor_module import Predictor
+import response_cache
+from metrics_module import inc
+
+KEEP = ARCHIVE_KEEP  # versions kept in memory, as many as model_bundle keeps archived
+POLL_INTERVAL = float(os.environ.get("VOGUE_MODEL_POLL", 2))  # seconds between checks of the bundle
+
+
+def _file_signature(path):
+    """Changes whenever the file is replaced or rewritten."""
+    st = os.stat(path)
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _retire(predictor):
+    """
+    Closes an evicted version's memory-mapped bundle as soon as the last
+    request (or response cache) still holding its Predictor lets go of it.
+    """
+    if predictor.bundle is not None:
+        weakref.finalize(predictor, predictor.bundle.close)
+
+
+class ModelRegistry:
+    """The active Predictor plus the last few versions, following the bundle on disk."""
+
+    def __init__(self, path=MODEL_PATH, keep=KEEP, poll_interval=POLL_INTERVAL, predictor=None):
+        self.path = path
+        self.keep = keep
+        self.poll_interval = poll_interval
+        self.current = None
+        self.loaded_at = None
+        self.last_error = None
+        self._versions = OrderedDict()  # version -> Predictor, oldest first
+        self._signature = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        if predictor is not None:
+            self._activate(predictor)
+
+    @property
+    def version(self):
+        return self.current.version if self.current is not None else None
+
+    # --- LOADING ---
+    def _activate(self, predictor):
+        self._versions.pop(predictor.version, None)
+        self._versions[predictor.version] = predictor
+        while len(self._versions) > self.keep:
+            _, evicted = self._versions.popitem(last=False)
+            _retire(evicted)
+        self.current = predictor  # the swap: one reference assignment
+        self.loaded_at = time.time()
+
+    def _compile(self, path):
+        """Loads, verifies and compiles a bundle. Anything wrong raises before it can be served."""
+        bundle = load_bundle(path)  # magic, schema and content hash checks
+        kept = self._versions.get(bundle.version)
+        if kept is not None:
+            bundle.close()
+            return kept
+
+        predictor = Predictor.from_bundle(bundle)
+        # Every cell must name a real outfit
+        if any(not 0 <= i < len(predictor.outfits) for plane in predictor.cells for row in plane for i in row):
+            raise ValueError(f"'{path}' predicts outfit indices outside its vocabulary")
+        if "numpy" in sys.modules:
+            predictor.table  # build the batch table now rather than on the first request
+        response_cache.for_predictor(predictor)  # and every assembled look
+        return predictor
+
+    def reload(self, force=False):
+        """
+        Loads the bundle if it changed since the last look (or `force`).
+        Returns True if a new version became active. A bad file is reported
+        and skipped; the current model keeps serving.
+        """
+        with self._lock:
+            try:
+                signature = _file_signature(self.path)
+                if not force and signature == self._signature:
+                    return False
+                # A broken file isn't retried every poll, only once it is rewritten
+                self._signature = signature
+                predictor = self._compile(self.path)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if self.current is None:
+                    raise
+                print(f"⚠️ Model reload failed, still serving {self.version}: {self.last_error}")
+                inc("vogue_model_reloads_total", result="failed")
+                return False
+
+            self.last_error = None
+            if self.current is not None and predictor.version == self.version:
+                return False
+            previous = self.version
+            self._activate(predictor)
+        if previous is not None:
+            print(f"🔄 Model {previous} -> {predictor.version}")
+        inc("vogue_model_reloads_total", result="ok")
+        return True
+
+    def rollback(self, version=None):
+        """
+        Switches this process to a version still in memory (default: the one
+        before the current). The file watcher stays on, so the next bundle
+        written takes over again.
+        """
+        with self._lock:
+            versions = list(self._versions)
+            if version is None:
+                if len(versions) < 2:
+                    raise ValueError("No earlier model version in memory")
+                version = versions[-2]
+            if version not in self._versions:
+                raise ValueError(f"Model version '{version}' is not in memory (have {', '.join(versions)})")
+            self._activate(self._versions[version])
+        inc("vogue_model_rollbacks_total")
+        return version
+
+    # --- WATCHING ---
+    def start(self):
+        """Loads the model if needed and starts the watcher thread (once). Returns self."""
+        if self.current is None:
+            self.reload(force=True)
+        if self._thread is None and self.poll_interval > 0:
+            self._thread = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._thread.start()
+        return self
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"⚠️ Model watcher: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        return {
+            "active": self.version,
+            "versions": list(reversed(self._versions)),  # newest first
+            "path": self.path,
+            "loaded_at": self.loaded_at,
+            "last_error": self.last_error,
+        }
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    try:
+        active = load_bundle(MODEL_PATH)
+        active_version = active.version
+        active.close()
+    except (OSError, ValueError):
+        active_version = None
+
+    if command == "list":
+        for version in list_archive():
+            print(f"   {'▶' if version == active_version else ' '} {version}")
+    elif command == "rollback":
+        versions = [v for v in list_archive() if v != active_version]
+        version = sys.argv[2] if len(sys.argv) > 2 else (versions[0] if versions else None)
+        if version is None or not os.path.exists(archive_path(version)):
+            sys.exit(f"❌ No archived model version {version or 'to roll back to'} in '{ARCHIVE_DIR}/'")
+        restore(version)
+        print(f"⏪ '{MODEL_PATH}' is now version {version}; running processes switch within {POLL_INTERVAL:g} s")
+    else:
+        sys.exit("Usage: python model_registry.py [list | rollback [VERSION]]")
@@ -0,0 +1,251 @@
+# palette_engine.py
+"""
+Scores arbitrary garment colors against a user's seasonal palette.
+
+Everything is converted to CIELAB once, at import: the four palettes from
+color_module and a table of ~950 named colors (named_colors.tsv, from the
+CC0 xkcd colour survey). Scoring a batch of hex colors is then a handful of
+NumPy operations: CIEDE2000 distances from every color to every Power,
+Neutral and Avoid swatch at once.
+
+    python palette_engine.py Medium Warm "#808000" "#FF69B4" "#2E4A1E"
+
+NumPy is imported here, so this module is kept out of the fast CLI/app
+start-up path; import it where colors are actually scored.
+"""
+import os
+import sys
+import numpy as np
+from color_module import PALETTES, get_season
+
+NAMED_COLORS_PATH = os.environ.get("VOGUE_NAMED_COLORS", "named_colors.tsv")
+
+# Fit falls to ~37% of its best once the nearest good color is this far away (ΔE00)
+FIT_FALLOFF = 20.0
+
+# Named-color lookups shortlist this many candidates by plain Lab distance
+# before the exact CIEDE2000 pass (agrees with a full scan on >99.9% of colors)
+SHORTLIST = 64
+
+# sRGB (D65) -> XYZ, and the D65 reference white
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+# --- COLOR SCIENCE ---
+def parse_hex(colors):
+    """['#FFAA00', 'fa0', ...] -> (n, 3) uint8 RGB. Raises ValueError on anything else."""
+    rgb = np.empty((len(colors), 3), dtype=np.uint8)
+    for i, color in enumerate(colors):
+        h = str(color).strip().lstrip("#")
+        if len(h) == 3:
+            h = "".join(c * 2 for c in h)
+        if len(h) != 6:
+            raise ValueError(f"'{color}' is not a hex color")
+        try:
+            value = int(h, 16)
+        except ValueError:
+            raise ValueError(f"'{color}' is not a hex color") from None
+        rgb[i] = (value >> 16, (value >> 8) & 0xFF, value & 0xFF)
+    return rgb
+
+
+def rgb_to_lab(rgb):
+    """(n, 3) sRGB 0-255 -> (n, 3) CIELAB under D65."""
+    c = np.asarray(rgb, dtype=float) / 255
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    t = (linear @ _RGB_TO_XYZ.T) / _WHITE
+    f = np.where(t > 216 / 24389, np.cbrt(t), (24389 / 27 * t + 16) / 116)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+def hex_to_lab(colors):
+    return rgb_to_lab(parse_hex(colors))
+
+
+def delta_e_2000(lab1, lab2):
+    """
+    CIEDE2000 distance between every row of `lab1` (n, 3) and every row of
+    `lab2` (m, 3), as an (n, m) array.
+    """
+    return _ciede2000(lab1[:, None, :], lab2[None, :, :])
+
+
+def _ciede2000(lab1, lab2):
+    """Elementwise CIEDE2000 over the last axis; the leading axes broadcast."""
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    G = 0.5 * (1 - np.sqrt(C_bar ** 7 / (C_bar ** 7 + 25.0 ** 7)))
+    a1p, a2p = (1 + G) * a1, (1 + G) * a2
+    C1p, C2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+    chroma_zero = (C1p * C2p) == 0
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, np.where(dhp < -180, dhp + 360, dhp))
+    dhp = np.where(chroma_zero, 0, dhp)
+    dHp = 2 * np.sqrt(C1p * C2p) * np.sin(np.radians(dhp / 2))
+
+    Lp_bar = (L1 + L2) / 2
+    Cp_bar = (C1p + C2p) / 2
+    h_sum = h1p + h2p
+    hp_bar = np.where(
+        chroma_zero, h_sum,
+        np.where(np.abs(h1p - h2p) <= 180, h_sum / 2, np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2))
+    )
+
+    T = (1 - 0.17 * np.cos(np.radians(hp_bar - 30)) + 0.24 * np.cos(np.radians(2 * hp_bar))
+         + 0.32 * np.cos(np.radians(3 * hp_bar + 6)) - 0.20 * np.cos(np.radians(4 * hp_bar - 63)))
+    d_theta = 30 * np.exp(-(((hp_bar - 275) / 25) ** 2))
+    R_C = 2 * np.sqrt(Cp_bar ** 7 / (Cp_bar ** 7 + 25.0 ** 7))
+    S_L = 1 + 0.015 * (Lp_bar - 50) ** 2 / np.sqrt(20 + (Lp_bar - 50) ** 2)
+    S_C = 1 + 0.045 * Cp_bar
+    S_H = 1 + 0.015 * Cp_bar * T
+    R_T = -np.sin(np.radians(2 * d_theta)) * R_C
+
+    return np.sqrt((dLp / S_L) ** 2 + (dCp / S_C) ** 2 + (dHp / S_H) ** 2 + R_T * (dCp / S_C) * (dHp / S_H))
+
+
+def _nearest(lab, targets, shortlist=SHORTLIST):
+    """
+    (index, ΔE00) of the closest target for every row of `lab`. Against a big
+    table, the `shortlist` nearest by Euclidean Lab distance (one matrix
+    product) are re-ranked with CIEDE2000 rather than scoring every pair.
+    """
+    rows = np.arange(len(lab))[:, None]
+    if len(targets) > shortlist:
+        squared = (lab ** 2).sum(axis=1)[:, None] + (targets ** 2).sum(axis=1)[None, :] - 2 * lab @ targets.T
+        candidates = np.argpartition(squared, shortlist, axis=1)[:, :shortlist]
+    else:
+        candidates = np.broadcast_to(np.arange(len(targets)), (len(lab), len(targets)))
+
+    d = _ciede2000(lab[:, None, :], targets[candidates])
+    best = d.argmin(axis=1)
+    return candidates[rows[:, 0], best], d[rows[:, 0], best]
+
+
+# --- REGISTRY (built once at import) ---
+def _load_named_colors(path):
+    names, hexes = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            name, _, color = line.rstrip("\n").partition("\t")
+            if name and color:
+                names.append(name)
+                hexes.append(color)
+    return tuple(names), tuple(hexes)
+
+
+NAMED_NAMES, NAMED_HEX = _load_named_colors(NAMED_COLORS_PATH)
+NAMED_LAB = hex_to_lab(NAMED_HEX)
+NAMED_LAB.flags.writeable = False
+
+
+def nearest_named(colors):
+    """The closest named color for each hex color: [(name, hex, ΔE00), ...]."""
+    index, distance = _nearest(hex_to_lab(colors), NAMED_LAB)
+    return [(NAMED_NAMES[i], NAMED_HEX[i], round(float(d), 2)) for i, d in zip(index, distance)]
+
+
+class _SeasonSwatches:
+    """One palette's swatches, pre-converted to Lab."""
+
+    def __init__(self, palette):
+        self.power_names = tuple(palette["Power"])
+        self.power_hex = tuple(palette["Power"].values())
+        self.avoid_hex = tuple(palette["Avoid"])
+        # Avoid swatches are only hex codes in color_module; give them readable names
+        self.avoid_names = tuple(name for name, _, _ in nearest_named(self.avoid_hex))
+
+        self.power = hex_to_lab(self.power_hex)
+        self.good = np.vstack([self.power, hex_to_lab(palette["Neutrals"])])  # Power + Neutrals both flatter
+        self.avoid = hex_to_lab(self.avoid_hex)
+        for a in (self.power, self.good, self.avoid):
+            a.flags.writeable = False
+
+
+SWATCHES = {season: _SeasonSwatches(palette) for season, palette in PALETTES.items()}
+
+
+# --- SCORING ---
+def score_arrays(colors, skin_tone, undertone):
+    """
+    The vectorized core, for ranking large catalogues. Returns a dict of
+    arrays aligned with `colors`: fit (0-100), power_index, power_delta_e,
+    avoid_index, avoid_delta_e.
+    """
+    s = SWATCHES[get_season(skin_tone, undertone)]
+    lab = hex_to_lab(colors)
+
+    to_good = delta_e_2000(lab, s.good)
+    to_power = to_good[:, :len(s.power)]
+    to_avoid = delta_e_2000(lab, s.avoid)
+
+    power_index = to_power.argmin(axis=1)
+    avoid_index = to_avoid.argmin(axis=1)
+    d_good = to_good.min(axis=1)
+    d_avoid = to_avoid.min(axis=1)
+
+    # Close to a flattering swatch, and closer to it than to anything to avoid
+    fit = 100 * np.exp(-d_good / FIT_FALLOFF) * d_avoid / np.maximum(d_avoid + d_good, 1e-9)
+    return {
+        "fit": fit,
+        "power_index": power_index,
+        "power_delta_e": to_power[np.arange(len(lab)), power_index],
+        "avoid_index": avoid_index,
+        "avoid_delta_e": d_avoid,
+    }
+
+
+def score_colors(colors, skin_tone, undertone):
+    """
+    Scores each hex color for a Skin Tone + Undertone. Returns one dict per
+    color with its fit score and the nearest Power and Avoid swatches.
+    """
+    s = SWATCHES[get_season(skin_tone, undertone)]
+    scores = score_arrays(colors, skin_tone, undertone)
+    return [
+        {
+            "color": color,
+            "fit": round(float(fit), 1),
+            "nearest_power": {"name": s.power_names[p], "hex": s.power_hex[p], "delta_e": round(float(dp), 2)},
+            "nearest_avoid": {"name": s.avoid_names[a], "hex": s.avoid_hex[a], "delta_e": round(float(da), 2)},
+        }
+        for color, fit, p, dp, a, da in zip(colors, scores["fit"], scores["power_index"], scores["power_delta_e"],
+                                            scores["avoid_index"], scores["avoid_delta_e"])
+    ]
+
+
+def rank_catalogue(colors, skin_tone, undertone, top=None):
+    """Indices into `colors`, best fit first (only the best `top` if given)."""
+    fit = score_arrays(colors, skin_tone, undertone)["fit"]
+    if top is not None and top < len(fit):
+        best = np.argpartition(-fit, top)[:top]
+        return best[np.argsort(-fit[best], kind="stable")].tolist()
+    return np.argsort(-fit, kind="stable").tolist()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        sys.exit('Usage: python palette_engine.py SKIN_TONE UNDERTONE "#RRGGBB" ["#RRGGBB" ...]')
+
+    skin_tone, undertone, colors = sys.argv[1].capitalize(), sys.argv[2].capitalize(), sys.argv[3:]
+    try:
+        results = score_colors(colors, skin_tone, undertone)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+
+    print(f"🎨 {PALETTES[get_season(skin_tone, undertone)]['Season']} palette")
+    for result, (name, _, _) in zip(results, nearest_named(colors)):
+        p, a = result["nearest_power"], result["nearest_avoid"]
+        print(f"   {result['color']} ({name}): fit {result['fit']:5.1f}  "
+              f"closest power {p['name']} ΔE {p['delta_e']}, closest avoid {a['name']} ΔE {a['delta_e']}")
@@ -0,0 +1,152 @@
+# planner_module.py
+"""
+Day-by-day outfit plans over a forecast horizon (a trip, a wedding weekend).
+
+One Open-Meteo request brings back the hourly and daily forecast for the
+whole horizon. Every hour is categorized in one vectorized pass, each day
+is split into dayparts, and the outfits for every day and daypart come out
+of a single batched prediction.
+
+    python main.py --plan Paris --days 5 --event Wedding --skin-tone Medium --undertone Warm
+
+NumPy is imported here, so this module is kept out of the fast CLI start-up
+path; main.py only imports it when --plan is given.
+"""
+from datetime import date, timedelta
+import numpy as np
+from predictor_module import FALLBACK_OUTFIT
+from color_module import get_advanced_color_palette
+from metrics_module import inc, timed
+from weather_cache import TTLCache, normalize_city
+import weather_module
+from weather_module import WEATHER_CATEGORIES
+
+DEFAULT_DAYS = 7
+
+# (name, first hour, end hour) in local time; a daypart's weather is its most common hourly category
+DAYPARTS = (("Morning", 6, 12), ("Afternoon", 12, 18), ("Evening", 18, 24))
+
+# Horizons are reused for as long as current weather is
+horizon_cache = TTLCache(maxsize=weather_module.FORECAST_CACHE_SIZE, ttl=weather_module.FORECAST_TTL)
+
+
+def get_forecast_horizon(city_name, days=DEFAULT_DAYS):
+    """
+    (hourly, daily) forecast blocks for a city, cached per (city, days).
+    Returns None if the city can't be found; lookup errors propagate.
+    """
+    key = (normalize_city(city_name), days)
+    cached = horizon_cache.get(key)
+    if cached is not None:
+        return cached
+
+    coords = weather_module.geocode(city_name)
+    if coords is None:
+        return None
+    result = weather_module.fetch_forecast_horizon(*coords, days)
+    horizon_cache.set(key, result)
+    return result
+
+
+def _fallback_horizon(days):
+    """Every hour 'Moderate' at 25°C, the same default get_weather falls back to."""
+    today = date.today()
+    return (
+        {"time": [""] * days * 24, "temperature_2m": [25.0] * days * 24, "weathercode": [0] * days * 24},
+        {"time": [(today + timedelta(days=d)).isoformat() for d in range(days)], "weathercode": [0] * days,
+         "temperature_2m_max": [25.0] * days, "temperature_2m_min": [25.0] * days}
+    )
+
+
+def classify_horizon(hourly, daily, days):
+    """
+    Vectorized weather for every day and daypart. Returns (day_categories (days,),
+    slot_categories (days, dayparts), slot_temps (days, dayparts)) as indices
+    into WEATHER_CATEGORIES and mean °C.
+    """
+    # 1. Categorize every hour at once, laid out as (days, 24)
+    hours = days * 24
+    temps = np.asarray(hourly["temperature_2m"][:hours], dtype=float).reshape(days, 24)
+    codes = np.asarray(hourly["weathercode"][:hours], dtype=float).reshape(days, 24)
+    hourly_categories = weather_module.categorize_weather_array(temps, codes)
+
+    # 2. Each daypart takes its most common hourly category (ties go to the
+    #    earlier category, so Rainy wins a tie) and its mean temperature
+    one_hot = hourly_categories[..., None] == np.arange(len(WEATHER_CATEGORIES))
+    slot_categories = np.stack(
+        [one_hot[:, start:end].sum(axis=1).argmax(axis=1) for _, start, end in DAYPARTS], axis=1
+    )
+    known = ~np.isnan(temps)
+    slot_temps = np.stack([
+        np.where(known[:, start:end], temps[:, start:end], 0).sum(axis=1)
+        / np.maximum(known[:, start:end].sum(axis=1), 1)
+        for _, start, end in DAYPARTS
+    ], axis=1)
+
+    # 3. A whole day is dressed for its daily weather code and high
+    day_categories = weather_module.categorize_weather_array(
+        daily["temperature_2m_max"][:days], daily["weathercode"][:days]
+    )
+    return day_categories, slot_categories, slot_temps
+
+
+@timed("plan")
+def plan_outfits(predictor, city, event, skin, undertone, days=DEFAULT_DAYS):
+    """
+    A day-by-day outfit plan for `days` days in `city`, from a single forecast
+    request and a single batched prediction. Falls back to 'Moderate' at
+    25°C (flagged with "forecast": false) if the forecast isn't available.
+    """
+    days = max(1, min(int(days), weather_module.MAX_FORECAST_DAYS))
+
+    # 1. One forecast call for the whole horizon
+    forecast = True
+    try:
+        horizon = get_forecast_horizon(city, days)
+        if horizon is None:
+            print(f"❌ City '{city}' not found.")
+            inc("vogue_weather_fallbacks_total", reason="not_found")
+    except Exception as e:
+        print(f"Error fetching forecast: {e}")
+        inc("vogue_weather_fallbacks_total", reason="error")
+        horizon = None
+    if horizon is None:
+        forecast = False
+        horizon = _fallback_horizon(days)
+    hourly, daily = horizon
+    days = min(days, len(daily["time"]), len(hourly["time"]) // 24)
+
+    # 2. Categorize the whole horizon
+    day_categories, slot_categories, slot_temps = classify_horizon(hourly, daily, days)
+    labels = np.array(WEATHER_CATEGORIES, dtype=object)
+    day_weathers = labels[day_categories].tolist()
+    slot_weathers = labels[slot_categories].tolist()
+
+    # 3. One prediction for every day and every daypart
+    weathers = day_weathers + [w for day in slot_weathers for w in day]
+    outfits = predictor.predict_batch(weathers, [event] * len(weathers), [skin] * len(weathers), default=FALLBACK_OUTFIT)
+    day_outfits, slot_outfits = outfits[:days], outfits[days:]
+
+    # 4. Assemble the plan
+    palette = get_advanced_color_palette(skin, undertone)
+    plan = []
+    for d in range(days):
+        plan.append({
+            "date": daily["time"][d],
+            "weather": day_weathers[d],
+            "temp_min": daily["temperature_2m_min"][d],
+            "temp_max": daily["temperature_2m_max"][d],
+            "outfit": day_outfits[d],
+            "dayparts": [
+                {"daypart": name, "weather": slot_weathers[d][p], "temp": round(float(slot_temps[d, p]), 1),
+                 "outfit": slot_outfits[d * len(DAYPARTS) + p]}
+                for p, (name, _, _) in enumerate(DAYPARTS)
+            ]
+        })
+
+    return {
+        "city": city, "event": event, "skin_tone": skin, "undertone": undertone,
+        "forecast": forecast, "season": palette['Season'],
+        "power_colors": dict(palette['Power']), "avoid_colors": list(palette['Avoid']),
+        "days": plan
+    }
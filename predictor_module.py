@@ -0,0 +1,124 @@
+# predictor_module.py
+from model_bundle import MODEL_PATH, load_bundle
+from metrics_module import timed
+
+# Returned by main.py when a label was never seen in training
+FALLBACK_OUTFIT = "Standard Smart Casual (Blue Jeans + White Shirt)"
+
+
+class Predictor:
+    """
+    The whole input space is tiny (Weather x Event x Skin), so instead of running
+    the encoders + decision tree on every request we evaluate the tree once for
+    every cell and keep the answers in a dense table indexed by the labels.
+    """
+
+    def __init__(self, weathers, events, skins, outfits, table, bundle=None):
+        self.bundle = bundle
+        self.version = bundle.version if bundle is not None else None
+        self.weathers = list(weathers)
+        self.events = list(events)
+        self.skins = list(skins)
+        self.outfits = list(outfits)
+
+        # Nested [weather][event][skin] -> outfit index lists. NumPy is only
+        # needed (and imported) once the batch path asks for the dense array.
+        self.cells = table.tolist() if hasattr(table, 'tolist') else [[list(row) for row in plane] for plane in table]
+        self._table = None
+
+        # String label -> index maps (this replaces LabelEncoder.transform)
+        self.weather_index = {w: i for i, w in enumerate(self.weathers)}
+        self.event_index = {e: i for i, e in enumerate(self.events)}
+        self.skin_index = {s: i for i, s in enumerate(self.skins)}
+
+        # Flat dict for single predictions: one lookup, no arrays allocated
+        self.lookup = {
+            (w, e, s): self.outfits[self.cells[i][j][k]]
+            for i, w in enumerate(self.weathers)
+            for j, e in enumerate(self.events)
+            for k, s in enumerate(self.skins)
+        }
+
+    @property
+    def table(self):
+        """Dense [weather, event, skin] -> outfit index array for batch lookups."""
+        if self._table is None:
+            import numpy as np
+            self._table = np.asarray(self.cells, dtype=np.int32)
+        return self._table
+
+    # --- BUILDING THE TABLE ---
+    @classmethod
+    def from_bundle(cls, bundle):
+        """Compiles a model bundle into a lookup table by walking the tree once per cell."""
+        v = bundle.vocabularies
+        table = [
+            [[bundle.predict_indices((i, j, k)) for k in range(len(v['skin']))] for j in range(len(v['event']))]
+            for i in range(len(v['weather']))
+        ]
+        return cls(v['weather'], v['event'], v['skin'], v['outfit'], table, bundle=bundle)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """Loads and compiles a model bundle (no scikit-learn or unpickling needed)."""
+        return cls.from_bundle(load_bundle(path))
+
+    # --- PREDICTION ---
+    @timed("predict")
+    def predict(self, weather, event, skin, default=FALLBACK_OUTFIT):
+        """Returns the outfit, or `default` if any label was never seen in training."""
+        return self.lookup.get((weather, event, skin), default)
+
+    @timed("predict")
+    def predict_safe(self, weather, event, skin, default_weather="Moderate", default_event="Casual", default_skin="Medium"):
+        """
+        Swaps each unknown label for a default before predicting (the old
+        safe_transform behaviour in app.py).
+        """
+        return self.lookup[self.resolve_labels(weather, event, skin, default_weather, default_event, default_skin)]
+
+    def resolve_labels(self, weather, event, skin, default_weather="Moderate", default_event="Casual", default_skin="Medium"):
+        """
+        The (weather, event, skin) labels predict_safe actually uses. If even
+        the default is unknown we fall back to the first class, like
+        safe_transform returning 0.
+        """
+        return (
+            self._known(weather, default_weather, self.weathers),
+            self._known(event, default_event, self.events),
+            self._known(skin, default_skin, self.skins)
+        )
+
+    @timed("predict_batch")
+    def predict_batch(self, weathers, events, skins, default=FALLBACK_OUTFIT):
+        """
+        Predicts whole columns at once: labels are encoded with one dict pass
+        per column and the outfits come out of a single fancy-indexing lookup.
+        Rows with an unseen label get `default`.
+        """
+        import numpy as np
+
+        w = self.encode(weathers, self.weather_index)
+        e = self.encode(events, self.event_index)
+        s = self.encode(skins, self.skin_index)
+
+        known = (w >= 0) & (e >= 0) & (s >= 0)
+        idx = np.where(known, self.table[w.clip(0), e.clip(0), s.clip(0)], len(self.outfits))
+
+        names = np.array(self.outfits + [default], dtype=object)
+        return names[idx].tolist()
+
+    @staticmethod
+    def encode(labels, index):
+        """Maps a column of string labels to class indices (-1 for unknown)."""
+        import numpy as np
+        return np.fromiter((index.get(label, -1) for label in labels), dtype=np.int32, count=len(labels))
+
+    @staticmethod
+    def _known(value, default_value, classes):
+        if value in classes:
+            return value
+        if default_value in classes:
+            return default_value
+        return classes[0]
+
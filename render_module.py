@@ -0,0 +1,61 @@
+# render_module.py
+from functools import lru_cache
+import asset_module
+from metrics_module import timed
+
+# --- UPGRADED DYNAMIC MANNEQUINS (WITH FACES) ---
+def build_mannequin_svg(gender, color_hex):
+    """Builds the SVG from scratch; call get_mannequin_svg, which caches it."""
+    skin_color = "#FAD7C0"
+    hair_color = "#4A3B2F"
+    shoe_color = "#333333"
+    
+    if gender == "Men":
+        # Stylized Male Figure with Face, Hair, Shirt, Pants, Shoes
+        return f"""
+        <svg width="200" height="450" viewBox="0 0 200 450" xmlns="http://www.w3.org/2000/svg">
+            <path d="M70,40 Q100,20 130,40 Q140,60 135,80 L65,80 Q60,60 70,40" fill="{hair_color}"/>
+            <ellipse cx="100" cy="75" rx="35" ry="45" fill="{skin_color}"/>
+            <circle cx="85" cy="70" r="3" fill="#333"/> <circle cx="115" cy="70" r="3" fill="#333"/>
+            <path d="M90,100 Q100,105 110,100" stroke="#333" fill="none"/>
+            <rect x="85" y="115" width="30" height="25" fill="{skin_color}"/>
+            <path d="M50,140 Q100,160 150,140 L160,180 L140,180 L140,280 L60,280 L60,180 L40,180 Z" fill="{color_hex}" stroke="#222" stroke-width="1"/>
+            <path d="M40,180 L20,250" stroke="{skin_color}" stroke-width="15" stroke-linecap="round"/>
+            <path d="M160,180 L180,250" stroke="{skin_color}" stroke-width="15" stroke-linecap="round"/>
+            <path d="M60,280 L140,280 L135,400 L100,370 L65,400 Z" fill="#3A3A3A"/>
+            <ellipse cx="65" cy="415" rx="20" ry="10" fill="{shoe_color}"/>
+            <ellipse cx="135" cy="415" rx="20" ry="10" fill="{shoe_color}"/>
+        </svg>
+        """
+    else:
+        # Stylized Female Figure with Face, Hair, Dress, Shoes
+        return f"""
+        <svg width="200" height="450" viewBox="0 0 200 450" xmlns="http://www.w3.org/2000/svg">
+            <path d="M60,50 Q100,10 140,50 L150,110 Q100,90 50,110 Z" fill="{hair_color}"/>
+            <ellipse cx="100" cy="75" rx="32" ry="40" fill="{skin_color}"/>
+            <circle cx="88" cy="72" r="2.5" fill="#333"/> <circle cx="112" cy="72" r="2.5" fill="#333"/>
+            <path d="M92,95 Q100,100 108,95" stroke="#333" fill="none"/>
+            <rect x="90" y="110" width="20" height="20" fill="{skin_color}"/>
+            <path d="M65,130 Q100,150 135,130 L155,300 Q100,320 45,300 Z" fill="{color_hex}" stroke="#222" stroke-width="1"/>
+            <path d="M65,130 L35,220" stroke="{skin_color}" stroke-width="12" stroke-linecap="round"/>
+            <path d="M135,130 L165,220" stroke="{skin_color}" stroke-width="12" stroke-linecap="round"/>
+            <path d="M85,300 L85,400 M115,300 L115,400" stroke="{skin_color}" stroke-width="14"/>
+            <path d="M75,400 L95,400 L90,420 L75,415 Z" fill="{shoe_color}"/>
+            <path d="M105,400 L125,400 L125,415 L110,420 Z" fill="{shoe_color}"/>
+        </svg>
+        """
+
+# Only 2 genders x a few dozen palette colors exist, so each SVG is built once
+get_mannequin_svg = timed("render_svg")(lru_cache(maxsize=256)(build_mannequin_svg))
+
+# --- DYNAMIC HERO IMAGES ---
+# Served from local downscaled copies; see asset_module.py
+@timed("hero_image")
+def get_hero_image(weather_condition):
+    """(src, srcset) for the hero <img> matching the weather ("Default" -> Moderate)."""
+    return asset_module.hero_image(weather_condition)
+
+def split_outfit(outfit_str):
+    parts = outfit_str.split('+')
+    while len(parts) < 3: parts.append("Accessories")
+    return [p.strip() for p in parts]
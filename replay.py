@@ -0,0 +1,245 @@
+# replay.py
+"""
+Replays a JSONL request log through the recommendation pipeline, either
+in-process or against a running service.py, and reports throughput, a
+latency histogram, the error rate and cache hit rates.
+
+    python replay.py requests.jsonl                           # in-process, 16 clients, flat out
+    python replay.py requests.jsonl --qps 200 --duration 30   # fixed arrival rate
+    python replay.py requests.jsonl --url http://localhost:8080 --concurrency 64
+    python replay.py --generate 5000 --stub --stub-latency 0.05
+
+Each log line is one {city, event, skin_tone, undertone, gender} record.
+With --qps latency is measured from each request's scheduled send time, so
+a backed-up system shows up as queueing delay instead of being hidden.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+# Upper edges of the latency histogram buckets, in milliseconds
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf")]
+
+
+def load_records(path):
+    """Request records from a JSONL log; lines without a city are skipped."""
+    from main import read_jsonl
+    records = [r for r in read_jsonl(path) if isinstance(r, dict) and r.get("city")]
+    if not records:
+        raise SystemExit(f"❌ No request records (objects with a 'city') in '{path}'")
+    return records
+
+
+# --- TARGETS ---
+class InProcessTarget:
+    """Calls main.recommend_one on a thread pool, one thread per client."""
+
+    def __init__(self, concurrency):
+        import main
+        self.main = main
+        self.predictor = main.load_resources()
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def send(self, record):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.pool, self.main.recommend_one, record, self.predictor)
+
+    def cache_stats(self):
+        from weather_module import cache_stats
+        return cache_stats()
+
+    async def close(self):
+        self.pool.shutdown(wait=False)
+
+
+class HttpTarget:
+    """POSTs each record to {url}/recommend over one pooled aiohttp session."""
+
+    def __init__(self, url, concurrency):
+        self.url = url.rstrip("/") + "/recommend"
+        self.concurrency = concurrency
+        self.session = None
+
+    async def send(self, record):
+        import aiohttp
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.concurrency))
+        async with self.session.post(self.url, json=record) as response:
+            await response.read()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}")
+
+    def cache_stats(self):
+        return None  # lives in the server process
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+
+# --- DRIVERS ---
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.errors = {}
+
+    async def timed(self, target, record, started):
+        try:
+            await target.send(record)
+        except Exception as e:
+            reason = type(e).__name__ if not str(e) else str(e)[:80]
+            self.errors[reason] = self.errors.get(reason, 0) + 1
+            return
+        self.latencies.append(time.perf_counter() - started)
+
+
+async def run_closed_loop(target, records, concurrency, recorder):
+    """N clients, each sending its next request as soon as the last one returns."""
+    stream = iter(records)
+
+    async def client():
+        for record in stream:
+            await recorder.timed(target, record, time.perf_counter())
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+
+async def run_open_loop(target, records, qps, concurrency, recorder):
+    """Requests start on a fixed schedule, whether or not earlier ones finished."""
+    slots = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    tasks = []
+
+    async def one(record, scheduled):
+        async with slots:
+            await recorder.timed(target, record, scheduled)
+
+    for i, record in enumerate(records):
+        scheduled = start + i / qps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(record, scheduled)))
+    await asyncio.gather(*tasks)
+
+
+async def replay(target, records, qps=None, concurrency=16):
+    recorder = Recorder()
+    before = target.cache_stats()
+    start = time.perf_counter()
+    try:
+        if qps:
+            await run_open_loop(target, records, qps, concurrency, recorder)
+        else:
+            await run_closed_loop(target, records, concurrency, recorder)
+    finally:
+        await target.close()
+    return build_report(recorder, time.perf_counter() - start, before, target.cache_stats(), qps, concurrency)
+
+
+# --- REPORTING ---
+def _hit_rates(before, after):
+    if after is None:
+        return None
+    rates = {}
+    for name, counts in after.items():
+        hits = counts["hits"] - before[name]["hits"]
+        misses = counts["misses"] - before[name]["misses"]
+        rates[name] = {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None}
+    return rates
+
+
+def build_report(recorder, elapsed, before, after, qps, concurrency):
+    ordered = sorted(recorder.latencies)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e3, 3) if ordered else None
+    total = len(ordered) + sum(recorder.errors.values())
+
+    histogram, i = [], 0
+    for edge in BUCKETS_MS:
+        count = 0
+        while i < len(ordered) and ordered[i] * 1e3 <= edge:
+            count += 1
+            i += 1
+        histogram.append({"le_ms": edge if edge != float("inf") else "inf", "count": count})
+
+    return {
+        "mode": f"{qps} qps" if qps else f"{concurrency} concurrent clients",
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else None,
+        "error_rate": round(sum(recorder.errors.values()) / total, 4) if total else 0,
+        "errors": recorder.errors,
+        "latency_ms": {"p50": pick(0.50), "p90": pick(0.90), "p95": pick(0.95), "p99": pick(0.99),
+                       "max": round(ordered[-1] * 1e3, 3) if ordered else None},
+        "histogram": histogram,
+        "cache": _hit_rates(before, after),
+    }
+
+
+def print_report(report):
+    print(f"\n📈 {report['requests']} requests in {report['elapsed_s']} s ({report['mode']})")
+    print(f"   throughput  {report['throughput_rps']} req/s")
+    print(f"   errors      {report['error_rate']:.2%}" + "".join(f"\n      {n} x {reason}" for reason, n in report["errors"].items()))
+    print("   latency ms  " + "  ".join(f"{k}={v}" for k, v in report["latency_ms"].items()))
+
+    peak = max(b["count"] for b in report["histogram"]) or 1
+    print("\n   ≤ ms        count")
+    for bucket in report["histogram"]:
+        if bucket["count"]:
+            print(f"   {bucket['le_ms']:>8}  {bucket['count']:>8}  {'█' * max(1, round(40 * bucket['count'] / peak))}")
+
+    if report["cache"]:
+        print("\n   cache       hit rate")
+        for name, c in report["cache"].items():
+            rate = "-" if c["hit_rate"] is None else f"{c['hit_rate']:.1%}"
+            print(f"   {name:<10}  {rate:>8}  ({c['hits']} hits / {c['misses']} misses)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a JSONL request log as load")
+    parser.add_argument("log", nargs="?", help="JSONL file of request records")
+    parser.add_argument("--generate", type=int, metavar="N", help="Replay N synthetic records instead of a log")
+    parser.add_argument("--url", help="Send to a running service.py instead of calling the pipeline in-process")
+    parser.add_argument("--qps", type=float, help="Fixed arrival rate (default: as fast as the clients go)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients (max in flight with --qps)")
+    parser.add_argument("--duration", type=float, help="With --qps: loop the log for this many seconds")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the log this many times")
+    parser.add_argument("--stub", action="store_true", help="In-process only: answer weather from a local stub Open-Meteo")
+    parser.add_argument("--stub-latency", type=float, default=0.0)
+    parser.add_argument("--stub-fail-rate", type=float, default=0.0)
+    parser.add_argument("--out", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.generate:
+        from benchmark_pipeline import make_workload
+        records = make_workload(args.generate, cities=max(1, args.generate // 10))
+    elif args.log:
+        records = load_records(args.log)
+    else:
+        parser.error("give a JSONL log or --generate N")
+
+    count = int(args.qps * args.duration) if args.qps and args.duration else len(records) * args.repeat
+    records = list(islice(cycle(records), count))
+
+    if args.stub:
+        if args.url:
+            parser.error("--stub swaps the in-process weather backend; start service.py against stub_server.py instead")
+        import weather_module
+        from stub_server import start_stub_server
+        stub = start_stub_server(latency=args.stub_latency, fail_rate=args.stub_fail_rate)
+        weather_module.GEOCODE_URL = f"{stub.url}/v1/search"
+        weather_module.FORECAST_URL = f"{stub.url}/v1/forecast"
+        print(f"🧪 Weather served by stub at {stub.url}")
+
+    target = HttpTarget(args.url, args.concurrency) if args.url else InProcessTarget(args.concurrency)
+    report = asyncio.run(replay(target, records, args.qps, args.concurrency))
+    print_report(report)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Report written to '{args.out}'")
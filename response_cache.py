@@ -0,0 +1,100 @@
+# response_cache.py
+"""
+Once the weather is known, a recommendation depends only on (weather, event,
+skin tone, undertone, gender): a few hundred combinations. Each loaded model
+version gets a ResponseCache with every one of them assembled up front:
+outfit, its parts and shop links, the palette, the mannequin SVG for every
+Power color and the JSON fields the service returns. Serving a look is then
+one dict lookup.
+
+Caches are keyed by model version, so a hot-reloaded model (see
+model_registry.py) gets a fresh cache and the old one simply ages out.
+"""
+import threading
+from collections import OrderedDict
+from itertools import product
+from types import MappingProxyType
+from predictor_module import FALLBACK_OUTFIT
+from color_module import get_advanced_color_palette
+from render_module import get_mannequin_svg, split_outfit
+from metrics_module import inc
+
+# The values the UI offers; anything else is assembled on demand, not stored
+UNDERTONES = ("Cool", "Warm")
+GENDERS = ("Women", "Men")
+
+SHOP_URL = "https://www.amazon.in/s?k={}"
+
+# Model versions whose caches are kept (matches model_registry's default)
+KEEP = 3
+
+
+class Look:
+    """Everything shown for one context after the weather lookup. Shared between requests: read only."""
+
+    __slots__ = ("outfit", "parts", "shop_links", "palette", "mannequins", "fields")
+
+    def __init__(self, predictor, weather, event, skin, undertone, gender):
+        self.outfit = predictor.predict(weather, event, skin, default=FALLBACK_OUTFIT)
+        self.parts = tuple(split_outfit(self.outfit))
+        self.shop_links = tuple((item, SHOP_URL.format(item.replace(' ', '+'))) for item in self.parts[:3])
+        self.palette = get_advanced_color_palette(skin, undertone)
+        self.mannequins = MappingProxyType(
+            {name: get_mannequin_svg(gender, color_hex) for name, color_hex in self.palette['Power'].items()}
+        )
+        # The model-dependent part of a /recommend response; format_look copies it into each response
+        self.fields = MappingProxyType({
+            "outfit": self.outfit, "season": self.palette['Season'],
+            "power_colors": MappingProxyType(dict(self.palette['Power'])), "avoid_colors": tuple(self.palette['Avoid'])
+        })
+
+
+def _gender(gender):
+    # render_module draws anything but "Men" as the female figure
+    return "Men" if gender == "Men" else "Women"
+
+
+class ResponseCache:
+    """Every Look for one model version, built when the cache is."""
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+        self.version = predictor.version
+        self.hits = 0
+        self.misses = 0
+        self.looks = {
+            key: Look(predictor, *key)
+            for key in product(predictor.weathers, predictor.events, predictor.skins, UNDERTONES, GENDERS)
+        }
+
+    def lookup(self, weather, event, skin, undertone, gender="Women"):
+        """The Look for a context. Labels the model or the UI don't know are assembled on the spot."""
+        key = (weather, event, skin, undertone, _gender(gender))
+        look = self.looks.get(key)
+        if look is None:
+            self.misses += 1
+            inc("vogue_response_cache_total", result="miss")
+            return Look(self.predictor, *key)
+        self.hits += 1
+        inc("vogue_response_cache_total", result="hit")
+        return look
+
+
+_caches = OrderedDict()  # model version -> ResponseCache, oldest first
+_lock = threading.Lock()
+
+
+def for_predictor(predictor):
+    """The ResponseCache for a predictor's model version, building it on first use."""
+    cache = _caches.get(predictor.version)
+    if cache is not None and cache.predictor is predictor:
+        return cache
+
+    with _lock:
+        cache = _caches.get(predictor.version)
+        if cache is None or cache.predictor is not predictor:
+            cache = _caches[predictor.version] = ResponseCache(predictor)
+        _caches.move_to_end(predictor.version)
+        while len(_caches) > KEEP:
+            _caches.popitem(last=False)
+    return cache
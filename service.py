@@ -0,0 +1,257 @@
+# service.py
+"""
+Headless JSON API for the recommendation pipeline, for clients that don't
+need the Streamlit UI (mobile app, partner integrations).
+
+    python service.py --port 8080 --workers 4
+
+    GET  /health            liveness: the process is up
+    GET  /ready             readiness: the model is loaded (503 until then)
+    GET  /model             active model version and the versions kept for rollback
+    GET  /upstreams         Open-Meteo circuit breaker states and weather cache counters
+    GET  /metrics           Prometheus text (needs VOGUE_METRICS=1, see metrics_module.py)
+    GET  /recommend?city=Paris&event=Party&skin_tone=Medium&undertone=Warm&gender=Women
+    POST /recommend         the same fields as a JSON object
+    POST /recommend/batch   a JSON list of those objects (or {"requests": [...]})
+    GET  /plan?city=Paris&days=5&event=Wedding&skin_tone=Medium&undertone=Warm
+    POST /plan              the same fields as a JSON object; a day-by-day outfit plan
+    POST /palette/score     {"skin_tone", "undertone", "colors": ["#RRGGBB", ...], "top": N}
+
+Each worker process loads the model once and serves from its own event loop,
+swapping in retrained models as they are written (see model_registry.py);
+the workers share one port through SO_REUSEPORT. Weather lookups block on
+HTTP, so cache misses run on a thread pool while cached cities are answered
+straight from the loop.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+import main
+import metrics_module
+import weather_module
+from model_registry import ModelRegistry
+from color_module import get_advanced_color_palette
+import palette_engine
+import planner_module
+import response_cache
+
+# --- SERVICE SETTINGS ---
+HOST = os.environ.get("VOGUE_SERVICE_HOST", "0.0.0.0")
+PORT = int(os.environ.get("VOGUE_SERVICE_PORT", 8080))
+WORKERS = int(os.environ.get("VOGUE_SERVICE_WORKERS", os.cpu_count() or 1))
+MAX_BATCH = int(os.environ.get("VOGUE_SERVICE_MAX_BATCH", 10000))  # records per /recommend/batch call
+
+REGISTRY = web.AppKey("registry", ModelRegistry)
+EXECUTOR = web.AppKey("executor", ThreadPoolExecutor)
+
+FIELDS = ("city", "event", "skin_tone", "undertone", "gender")
+
+
+def _bad_request(reason):
+    return web.json_response({"error": reason}, status=400)
+
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text='{"error": "body is not valid JSON"}', content_type="application/json")
+
+
+async def _weather(app, city):
+    """(category, temp, freshness) for a city; only lookups that have to wait on the network leave the event loop."""
+    cached = weather_module.cached_weather(city)
+    if cached is not None:
+        return cached
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app[EXECUTOR], weather_module.get_weather_tagged, city)
+
+
+# --- HANDLERS ---
+async def health(request):
+    return web.json_response({"status": "ok"})
+
+
+async def ready(request):
+    registry = request.app.get(REGISTRY)
+    if registry is None or registry.current is None:
+        return web.json_response({"status": "loading"}, status=503)
+    return web.json_response({"status": "ready", "model_version": registry.version})
+
+
+async def model(request):
+    return web.json_response(request.app[REGISTRY].status())
+
+
+async def upstreams(request):
+    return web.json_response({"circuits": weather_module.circuit_states(), "cache": weather_module.cache_stats()})
+
+
+async def recommend(request):
+    if request.method == "POST":
+        row = await _read_json(request)
+        if not isinstance(row, dict):
+            return _bad_request("expected a JSON object")
+    else:
+        row = {k: request.query[k] for k in FIELDS if k in request.query}
+
+    city, event, skin, undertone = main.normalize_request(row)
+    if not city:
+        return _bad_request("'city' is required")
+
+    predictor = request.app[REGISTRY].current
+    weather_cat, temp, freshness = await _weather(request.app, city)
+    look = response_cache.for_predictor(predictor).lookup(weather_cat, event, skin, undertone, row.get("gender"))
+    return web.json_response(main.format_look(row, city, event, skin, undertone, weather_cat, temp, look, freshness))
+
+
+async def recommend_batch(request):
+    body = await _read_json(request)
+    rows = body.get("requests") if isinstance(body, dict) else body
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        return _bad_request("expected a JSON list of request objects")
+    if len(rows) > MAX_BATCH:
+        return _bad_request(f"at most {MAX_BATCH} requests per batch")
+
+    # recommend_batch fetches weather for the whole batch at once, so run it off the loop
+    predictor = request.app[REGISTRY].current
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(
+        request.app[EXECUTOR], lambda: list(main.recommend_batch(rows, predictor=predictor))
+    )
+    return web.json_response({"model_version": predictor.version, "results": results})
+
+
+async def plan(request):
+    if request.method == "POST":
+        row = await _read_json(request)
+        if not isinstance(row, dict):
+            return _bad_request("expected a JSON object")
+    else:
+        row = dict(request.query)
+
+    city, event, skin, undertone = main.normalize_request(row)
+    if not city:
+        return _bad_request("'city' is required")
+    try:
+        days = int(row.get("days", planner_module.DEFAULT_DAYS))
+    except (TypeError, ValueError):
+        return _bad_request("'days' must be an integer")
+
+    # One forecast request for the whole horizon, off the loop
+    predictor = request.app[REGISTRY].current
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        request.app[EXECUTOR], planner_module.plan_outfits, predictor, city, event, skin, undertone, days
+    )
+    return web.json_response({"model_version": predictor.version, **result})
+
+
+async def metrics(request):
+    return web.Response(text=metrics_module.render_prometheus(), content_type="text/plain",
+                        headers={"X-Metrics-Enabled": str(metrics_module.ENABLED).lower()})
+
+
+@web.middleware
+async def _time_requests(request, handler):
+    route = request.match_info.route.resource.canonical if request.match_info.route.resource else "unmatched"
+    status = 500
+    try:
+        with metrics_module.span("http_request", route=route):
+            response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        # aiohttp raises 4xx/5xx responses (e.g. from _read_json); count them too
+        status = e.status
+        raise
+    finally:
+        metrics_module.inc("vogue_http_requests_total", route=route, status=status)
+
+
+async def palette_score(request):
+    body = await _read_json(request)
+    if not isinstance(body, dict) or not isinstance(body.get("colors"), list):
+        return _bad_request("expected {\"skin_tone\", \"undertone\", \"colors\": [...]}")
+    _, _, skin, undertone = main.normalize_request(body)
+
+    try:
+        results = palette_engine.score_colors(body["colors"], skin, undertone)
+    except ValueError as e:
+        return _bad_request(str(e))
+
+    # Best fit first, optionally only the top N (e.g. to rank a catalogue)
+    results.sort(key=lambda r: -r["fit"])
+    if isinstance(body.get("top"), int):
+        results = results[:body["top"]]
+    return web.json_response({"season": get_advanced_color_palette(skin, undertone)["Season"], "results": results})
+
+
+# --- APP ---
+async def _load_model(app):
+    # Loaded once per worker, before the worker starts accepting connections
+    app[REGISTRY] = ModelRegistry().start()
+    app[EXECUTOR] = ThreadPoolExecutor(max_workers=weather_module.WEATHER_CONCURRENCY)
+
+
+async def _shutdown(app):
+    app[REGISTRY].stop()
+    app[EXECUTOR].shutdown(wait=False, cancel_futures=True)
+
+
+def create_app(predictor=None):
+    """
+    Builds the aiohttp app. Pass a `predictor` to skip loading model.bundle
+    (handy for embedding); it is served as-is, without watching for new versions.
+    """
+    middlewares = [_time_requests] if metrics_module.ENABLED else []
+    app = web.Application(client_max_size=64 * 1024 ** 2, middlewares=middlewares)
+    if predictor is not None:
+        app[REGISTRY] = ModelRegistry(predictor=predictor, poll_interval=0)
+        app[EXECUTOR] = ThreadPoolExecutor(max_workers=weather_module.WEATHER_CONCURRENCY)
+    else:
+        app.on_startup.append(_load_model)
+    app.on_cleanup.append(_shutdown)
+
+    app.router.add_get("/health", health)
+    app.router.add_get("/ready", ready)
+    app.router.add_get("/model", model)
+    app.router.add_get("/upstreams", upstreams)
+    app.router.add_get("/metrics", metrics)
+    app.router.add_route("GET", "/recommend", recommend)
+    app.router.add_route("POST", "/recommend", recommend)
+    app.router.add_post("/recommend/batch", recommend_batch)
+    app.router.add_route("GET", "/plan", plan)
+    app.router.add_route("POST", "/plan", plan)
+    app.router.add_post("/palette/score", palette_score)
+    return app
+
+
+def serve(host=HOST, port=PORT, reuse_port=False):
+    web.run_app(create_app(), host=host, port=port, reuse_port=reuse_port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vogue AI recommendation service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Processes sharing the port (default: all cores)")
+    args = parser.parse_args()
+
+    print(f"💎 Serving on http://{args.host}:{args.port} with {args.workers} worker(s) (Ctrl+C to stop)")
+    if args.workers == 1:
+        serve(args.host, args.port)
+    else:
+        workers = [multiprocessing.Process(target=serve, args=(args.host, args.port, True), daemon=True)
+                   for _ in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
@@ -0,0 +1,120 @@
+# startup_check.py
+"""
+Cold-start regression check. Imports each entry point in a fresh interpreter
+with `python -X importtime`, reports where the time goes and fails if an
+entry point is over its budget or pulls in a module it shouldn't.
+
+Budgets are multiples of a bare interpreter's start-up imports
+(`python -X importtime -c pass`), measured in the same run, so they hold on
+faster and slower machines alike.
+
+    python startup_check.py            # check against startup_budget.json
+    python startup_check.py --update   # re-baseline the budgets from this machine
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+BUDGET_PATH = 'startup_budget.json'
+
+# Budgets are re-baselined to this multiple of the measured time plus a floor,
+# so a small entry point's run-to-run noise doesn't fail it
+HEADROOM = 1.4
+FLOOR_MS = 15
+
+
+def importtime(code):
+    """
+    Runs `code` in a fresh interpreter under -X importtime. Returns
+    ({module: cumulative_ms}, top-level ms), the latter summing only the
+    imports nothing else triggered.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{code}' failed:\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    top_level = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1000
+        if not name[1:].startswith(" "):  # nested imports are indented
+            top_level += int(cumulative) / 1000
+    return modules, top_level
+
+
+def measure_bare(runs=5):
+    """Fastest start-up import time (ms) of an interpreter that runs nothing: the unit budgets are in."""
+    return min(importtime("pass")[1] for _ in range(runs))
+
+
+def measure(entry_modules, runs=5):
+    """
+    Imports `entry_modules` in a fresh interpreter `runs` times and keeps the
+    fastest run. Returns (total_ms, {module: cumulative_ms}).
+    """
+    best = None
+    for _ in range(runs):
+        modules, _ = importtime("import " + ", ".join(entry_modules))
+        total = sum(modules.get(name, 0) for name in entry_modules)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    return best
+
+
+def check(budgets, top=8):
+    failures = []
+    bare = measure_bare()
+    print(f"🐍 bare interpreter: {bare:.0f} ms")
+    for entry, spec in budgets.items():
+        total, modules = measure(spec["modules"])
+        budget_ms = spec["budget_x_bare"] * bare
+        print(f"\n🚀 {entry}: {total:.0f} ms = {total / bare:.2f}x bare (budget {spec['budget_x_bare']}x = {budget_ms:.0f} ms)")
+        for name, ms in sorted(modules.items(), key=lambda kv: -kv[1])[:top]:
+            print(f"   {ms:8.1f} ms  {name}")
+
+        if total > budget_ms:
+            failures.append(f"{entry} took {total / bare:.2f}x bare start-up, budget is {spec['budget_x_bare']}x")
+
+        loaded = {name.split(".")[0] for name in modules}
+        for heavy in spec.get("forbidden", []):
+            if heavy in loaded:
+                failures.append(f"{entry} imports '{heavy}' at startup")
+    return failures
+
+
+def update(budgets):
+    bare = measure_bare()
+    print(f"🐍 bare interpreter: {bare:.0f} ms")
+    for entry, spec in budgets.items():
+        total, _ = measure(spec["modules"])
+        spec.pop("budget_ms", None)
+        spec["budget_x_bare"] = round((total * HEADROOM + FLOOR_MS) / bare, 2)
+        print(f"📏 {entry}: {total:.0f} ms = {total / bare:.2f}x bare -> budget {spec['budget_x_bare']}x")
+    with open(BUDGET_PATH, "w") as f:
+        json.dump(budgets, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time startup budget check")
+    parser.add_argument("--update", action="store_true", help="Rewrite the budgets from the current measurements")
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH) as f:
+        budgets = json.load(f)
+
+    if args.update:
+        update(budgets)
+        sys.exit(0)
+
+    failures = check(budgets)
+    if failures:
+        print("\n❌ Startup budget exceeded:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("\n✅ All entry points within their startup budget.")
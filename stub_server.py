@@ -0,0 +1,166 @@
+# stub_server.py
+"""
+A local stand-in for the Open-Meteo geocoding + forecast APIs, so the weather
+path can be exercised offline with controllable latency and failures.
+
+    python stub_server.py --port 8099 --latency 0.2 --fail-rate 0.1
+
+then point the app at it:
+
+    VOGUE_GEOCODE_URL=http://127.0.0.1:8099/v1/search
+    VOGUE_FORECAST_URL=http://127.0.0.1:8099/v1/forecast
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Cities the stub pretends not to know
+MISSING_CITIES = {"atlantis", "nowhere"}
+
+# Mix of clear, cloudy and rainy WMO codes
+WEATHER_CODES = [0, 1, 2, 3, 61, 80]
+
+
+def fake_coordinates(name):
+    """Deterministic coordinates for a city name."""
+    h = zlib.crc32(name.strip().lower().encode())
+    return round((h % 12000) / 100 - 60, 4), round((h // 12000 % 36000) / 100 - 180, 4)
+
+def fake_current_weather(lat, lon):
+    """Deterministic current weather: warmer near the equator, some rain."""
+    h = zlib.crc32(f"{lat:.2f},{lon:.2f}".encode())
+    return {
+        "temperature": round(35 - abs(lat) * 0.5 + (h % 50) / 10, 1),
+        "windspeed": float(h % 30),
+        "weathercode": WEATHER_CODES[h % len(WEATHER_CODES)],
+        "time": time.strftime("%Y-%m-%dT%H:00", time.gmtime())
+    }
+
+def fake_horizon(lat, lon, days):
+    """Deterministic hourly + daily forecast: a daily temperature cycle that drifts day to day."""
+    start = time.time() - time.time() % 86400
+    base = 35 - abs(lat) * 0.5
+    hourly = {"time": [], "temperature_2m": [], "weathercode": []}
+    daily = {"time": [], "weathercode": [], "temperature_2m_max": [], "temperature_2m_min": []}
+    for day in range(days):
+        date = time.strftime("%Y-%m-%d", time.gmtime(start + day * 86400))
+        h = zlib.crc32(f"{lat:.2f},{lon:.2f},{day}".encode())
+        code = WEATHER_CODES[h % len(WEATHER_CODES)]
+        mean = base + (h % 80) / 10 - 4
+        temps = [round(mean + 5 * math.sin((hour - 9) * math.pi / 12), 1) for hour in range(24)]
+        hourly["time"] += [f"{date}T{hour:02d}:00" for hour in range(24)]
+        hourly["temperature_2m"] += temps
+        # The day's weather sets in from late morning
+        hourly["weathercode"] += [code if hour >= 10 else WEATHER_CODES[0] for hour in range(24)]
+        daily["time"].append(date)
+        daily["weathercode"].append(code)
+        daily["temperature_2m_max"].append(max(temps))
+        daily["temperature_2m_min"].append(min(temps))
+    return hourly, daily
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    # Headers and body go out in separate writes; with Nagle on, every
+    # keep-alive response would stall ~40 ms waiting on a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        with server.lock:
+            server.request_count += 1
+            server.path_counts[url.path] += 1
+
+        # Simulate a slow and/or flaky upstream
+        if server.latency:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+        if server.fail_rate and random.random() < server.fail_rate:
+            return self._send(503, {"error": True, "reason": "stub failure"})
+
+        query = parse_qs(url.query)
+        if url.path == "/v1/search":
+            return self._send(200, self._search(query))
+        if url.path == "/v1/forecast":
+            return self._send(200, self._forecast(query))
+        self._send(404, {"error": True, "reason": "not found"})
+
+    def _search(self, query):
+        name = query.get("name", [""])[0]
+        if not name.strip() or name.strip().lower() in MISSING_CITIES:
+            return {"generationtime_ms": 0.1}
+        lat, lon = fake_coordinates(name)
+        return {"results": [{"name": name.strip().title(), "latitude": lat, "longitude": lon}]}
+
+    def _forecast(self, query):
+        # Comma-separated lists ask for several locations at once, answered as a list
+        lats = [float(v) for v in query["latitude"][0].split(",")]
+        lons = [float(v) for v in query["longitude"][0].split(",")]
+        days = int(query.get("forecast_days", ["7"])[0])
+        locations = []
+        for i, (lat, lon) in enumerate(zip(lats, lons)):
+            location = {"latitude": lat, "longitude": lon, "location_id": i}
+            if "current_weather" in query:
+                location["current_weather"] = fake_current_weather(lat, lon)
+            if "hourly" in query or "daily" in query:
+                location["hourly"], location["daily"] = fake_horizon(lat, lon, days)
+            locations.append(location)
+        if len(locations) > 1 and self.server.drop_locations:
+            # Misbehave like a partial upstream answer: fewer locations than asked for
+            locations = locations[:-self.server.drop_locations]
+        if len(locations) == 1:
+            del locations[0]["location_id"]
+            return locations[0]
+        return locations
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+
+def start_stub_server(port=0, latency=0.0, jitter=0.0, fail_rate=0.0):
+    """Starts the stub in a daemon thread and returns the server (see `server.url`)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.fail_rate = fail_rate
+    server.request_count = 0
+    server.path_counts = Counter()  # requests per path, e.g. "/v1/forecast"
+    server.drop_locations = 0  # leave this many locations out of multi-location answers
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Open-Meteo stub")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.port, args.latency, args.jitter, args.fail_rate)
+    print(f"🧪 Stub Open-Meteo running on {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
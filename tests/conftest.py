@@ -0,0 +1,33 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client
+import weather_module
+from stub_server import start_stub_server
+from weather_cache import GeocodeStore, TTLCache
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """
+    A local stub Open-Meteo with weather_module pointed at it: empty caches,
+    fresh breakers and an HTTP client that doesn't retry (so every failure
+    is exactly one upstream request).
+    """
+    server = start_stub_server()
+    monkeypatch.setattr(weather_module, "GEOCODE_URL", f"{server.url}/v1/search")
+    monkeypatch.setattr(weather_module, "FORECAST_URL", f"{server.url}/v1/forecast")
+    monkeypatch.setattr(weather_module, "geocode_store", GeocodeStore(":memory:"))
+    monkeypatch.setattr(weather_module, "forecast_cache", TTLCache(maxsize=1024, ttl=600, stale_ttl=weather_module.MAX_STALE))
+    monkeypatch.setattr(weather_module, "breakers", {
+        "geocode": http_client.CircuitBreaker("geocode"), "forecast": http_client.CircuitBreaker("forecast")
+    })
+    monkeypatch.setattr(http_client, "_client", http_client.HttpClient(retries=0))
+    yield server
+    server.shutdown()
+    server.server_close()
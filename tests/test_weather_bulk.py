@@ -0,0 +1,113 @@
+# tests/test_weather_bulk.py
+import threading
+import time
+
+import weather_module
+
+FORECAST = "/v1/forecast"
+GEOCODE = "/v1/search"
+
+
+def cities(n, prefix="Benchtown"):
+    return [f"{prefix} {i}" for i in range(n)]
+
+
+def test_one_forecast_request_per_batch(stub):
+    names = cities(250)
+    results = weather_module.get_weather_many(names, batch_size=100)
+
+    assert len(results) == 250
+    assert stub.path_counts[FORECAST] == 3  # 100 + 100 + 50 locations
+    assert stub.path_counts[GEOCODE] == 250
+
+
+def test_bulk_matches_single_lookups(stub):
+    names = cities(20)
+    bulk = weather_module.get_weather_many(names)
+    weather_module.forecast_cache.clear()
+    assert bulk == [weather_module.get_weather(name) for name in names]
+
+
+def test_duplicate_cities_are_fetched_once(stub):
+    results = weather_module.get_weather_many(["Benchtown 1", " benchtown 1 ", "BENCHTOWN 1"])
+
+    assert len(set(results)) == 1
+    assert stub.path_counts[GEOCODE] == 1
+    assert stub.path_counts[FORECAST] == 1
+
+
+def test_concurrent_single_lookups_share_one_request(stub):
+    stub.latency = 0.2
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(weather_module.get_weather("Benchtown 7")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(results)) == 1 and len(results) == 8
+    assert stub.path_counts[GEOCODE] == 1
+    assert stub.path_counts[FORECAST] == 1
+
+
+def test_batch_waits_for_a_concurrent_single_lookup(stub):
+    stub.latency = 0.2
+    single = []
+    t = threading.Thread(target=lambda: single.append(weather_module.get_weather("Benchtown 7")))
+    t.start()
+    time.sleep(0.05)  # the single lookup is on the wire
+    batch = weather_module.get_weather_many(["Benchtown 7", "Benchtown 8"])
+    t.join()
+
+    assert batch[0] == single[0]
+    # Benchtown 7: one geocode + one single forecast; Benchtown 8: one geocode + one bulk forecast
+    assert stub.path_counts[GEOCODE] == 2
+    assert stub.path_counts[FORECAST] == 2
+
+
+def test_single_lookup_waits_for_a_concurrent_batch(stub):
+    stub.latency = 0.2
+    batch = []
+    t = threading.Thread(target=lambda: batch.extend(weather_module.get_weather_many(cities(5))))
+    t.start()
+    time.sleep(0.05)
+    single = weather_module.get_weather("Benchtown 3")
+    t.join()
+
+    assert single == batch[3]
+    assert stub.path_counts[FORECAST] == 1
+
+
+def test_short_forecast_answer_falls_back_per_city(stub):
+    stub.drop_locations = 1
+    names = cities(3)
+    results = weather_module.get_weather_many_tagged(names)
+
+    assert len(results) == 3
+    assert all(freshness["status"] == "fallback" for _, _, freshness in results)
+    assert [(category, temp) for category, temp, _ in results] == [weather_module.FALLBACK_WEATHER] * 3
+    assert not weather_module._inflight
+
+
+def test_short_forecast_answer_uses_last_known_weather(stub, monkeypatch):
+    names = cities(3)
+    known = weather_module.get_weather_many(names)
+    # Everything expired, and too old to be served while it refreshes
+    monkeypatch.setattr(weather_module.forecast_cache, "ttl", 0)
+    monkeypatch.setattr(weather_module, "FORECAST_TTL", 0)
+    monkeypatch.setattr(weather_module, "STALE_TTL", 0)
+    stub.drop_locations = 1
+
+    results = weather_module.get_weather_many_tagged(names)
+
+    assert [(category, temp) for category, temp, _ in results] == known
+    assert all(freshness["status"] == "stale" for _, _, freshness in results)
+
+
+def test_unknown_city_gets_the_default(stub):
+    results = weather_module.get_weather_many_tagged(["Atlantis", "Benchtown 1"])
+
+    assert results[0][:2] == weather_module.FALLBACK_WEATHER
+    assert results[0][2]["status"] == "fallback"
+    assert results[1][2]["status"] == "live"
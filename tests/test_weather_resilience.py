@@ -0,0 +1,183 @@
+# tests/test_weather_resilience.py
+import threading
+import time
+
+import pytest
+
+import weather_module
+from http_client import CircuitBreaker
+
+FORECAST = "/v1/forecast"
+
+# In the gazetteer, so only forecast requests reach the stub
+CITIES = ["Paris", "Lima", "Oslo", "Tokyo", "Cairo"]
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    """A forecast breaker that opens after 3 failures and waits 0.2 s before its trial call."""
+    b = CircuitBreaker("forecast", failures=3, cooldown=0.2)
+    monkeypatch.setitem(weather_module.breakers, "forecast", b)
+    return b
+
+
+@pytest.fixture
+def short_ttl(monkeypatch):
+    """Weather is fresh for 0.2 s, then served stale (while refreshing) for another 60 s."""
+    monkeypatch.setattr(weather_module, "FORECAST_TTL", 0.2)
+    monkeypatch.setattr(weather_module, "STALE_TTL", 60)
+    monkeypatch.setattr(weather_module.forecast_cache, "ttl", 0.2)
+
+
+def expire_everything(monkeypatch):
+    """Cached weather is now too old to answer straight away; only an outage falls back to it."""
+    monkeypatch.setattr(weather_module, "FORECAST_TTL", 0)
+    monkeypatch.setattr(weather_module, "STALE_TTL", 0)
+    monkeypatch.setattr(weather_module.forecast_cache, "ttl", 0)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def open_breaker(stub, breaker):
+    stub.fail_rate = 1.0
+    for city in CITIES[:breaker.failures]:
+        weather_module.get_weather_tagged(city)
+    assert breaker.state == "open"
+
+
+# --- CIRCUIT BREAKER ---
+def test_breaker_opens_after_n_failures(stub, breaker):
+    stub.fail_rate = 1.0
+    for city in CITIES[:2]:
+        weather_module.get_weather_tagged(city)
+    assert breaker.state == "closed"
+
+    weather_module.get_weather_tagged(CITIES[2])
+    assert breaker.state == "open"
+    assert stub.path_counts[FORECAST] == 3
+
+
+def test_open_breaker_fails_fast(stub, breaker):
+    open_breaker(stub, breaker)
+    stub.latency = 1.0  # a request would take a second
+
+    start = time.perf_counter()
+    category, temp, freshness = weather_module.get_weather_tagged(CITIES[3])
+
+    assert time.perf_counter() - start < 0.5
+    assert (category, temp) == weather_module.FALLBACK_WEATHER and freshness["status"] == "fallback"
+    assert stub.path_counts[FORECAST] == 3
+
+
+def test_half_open_lets_one_trial_through(stub, breaker):
+    open_breaker(stub, breaker)
+    time.sleep(breaker.cooldown)
+    assert breaker.state == "half_open"
+    stub.fail_rate = 0.0
+    stub.latency = 0.2
+
+    results = {}
+    threads = [threading.Thread(target=lambda c=c: results.update({c: weather_module.get_weather_tagged(c)}))
+               for c in CITIES]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert stub.path_counts[FORECAST] == 3 + 1
+    assert sorted(r[2]["status"] for r in results.values()) == ["fallback"] * 4 + ["live"]
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens(stub, breaker):
+    open_breaker(stub, breaker)
+    time.sleep(breaker.cooldown)
+
+    weather_module.get_weather_tagged(CITIES[3])
+
+    assert stub.path_counts[FORECAST] == 3 + 1
+    assert breaker.state == "open"
+
+
+def test_client_errors_do_not_open_the_breaker(stub, breaker, monkeypatch):
+    monkeypatch.setattr(weather_module, "FORECAST_URL", f"{stub.url}/v1/no-such-endpoint")  # answers 404
+
+    for city in CITIES:
+        weather_module.get_weather_tagged(city)
+
+    assert stub.path_counts["/v1/no-such-endpoint"] == len(CITIES)
+    assert breaker.state == "closed"
+
+
+def test_client_error_frees_the_trial_slot(stub, breaker, monkeypatch):
+    open_breaker(stub, breaker)
+    time.sleep(breaker.cooldown)
+    stub.fail_rate = 0.0
+    monkeypatch.setattr(weather_module, "FORECAST_URL", f"{stub.url}/v1/no-such-endpoint")
+    weather_module.get_weather_tagged(CITIES[3])
+    assert breaker.state == "half_open"
+
+    monkeypatch.setattr(weather_module, "FORECAST_URL", f"{stub.url}/v1/forecast")
+    assert weather_module.get_weather_tagged(CITIES[4])[2]["status"] == "live"
+    assert breaker.state == "closed"
+
+
+# --- STALE WHILE REVALIDATE ---
+def test_single_lookup_serves_stale_and_refreshes(stub, short_ttl):
+    assert weather_module.get_weather_tagged("Paris")[2]["status"] == "live"
+    time.sleep(0.25)
+    stub.latency = 0.5
+
+    start = time.perf_counter()
+    category, temp, freshness = weather_module.get_weather_tagged("Paris")
+
+    assert time.perf_counter() - start < 0.2  # answered without waiting on the upstream
+    assert freshness["status"] == "stale"
+    wait_for(lambda: weather_module.forecast_cache.get("paris") is not None)
+    assert stub.path_counts[FORECAST] == 2
+    assert weather_module.get_weather_tagged("Paris")[2]["status"] == "cached"
+
+
+def test_bulk_lookup_serves_stale_and_refreshes(stub, short_ttl):
+    names = CITIES[:3]
+    assert {r[2]["status"] for r in weather_module.get_weather_many_tagged(names)} == {"live"}
+    time.sleep(0.25)
+    stub.latency = 0.5
+
+    start = time.perf_counter()
+    results = weather_module.get_weather_many_tagged(names)
+
+    assert time.perf_counter() - start < 0.2
+    assert {r[2]["status"] for r in results} == {"stale"}
+    wait_for(lambda: all(weather_module.forecast_cache.get(n.lower()) is not None for n in names))
+    assert {r[2]["status"] for r in weather_module.get_weather_many_tagged(names)} == {"cached"}
+
+
+def test_single_lookup_serves_last_known_while_open(stub, breaker, monkeypatch):
+    known = weather_module.get_weather("Paris")
+    expire_everything(monkeypatch)
+    open_breaker(stub, breaker)
+    requests_so_far = stub.path_counts[FORECAST]
+
+    category, temp, freshness = weather_module.get_weather_tagged("Paris")
+
+    assert (category, temp) == known and freshness["status"] == "stale"
+    assert stub.path_counts[FORECAST] == requests_so_far
+
+
+def test_bulk_lookup_serves_last_known_while_open(stub, breaker, monkeypatch):
+    known = weather_module.get_weather_many(["Paris", "Lima"])
+    expire_everything(monkeypatch)
+    open_breaker(stub, breaker)
+    requests_so_far = stub.path_counts[FORECAST]
+
+    results = weather_module.get_weather_many_tagged(["Paris", "Lima", "Tokyo"])
+
+    assert [r[:2] for r in results[:2]] == known
+    assert [r[2]["status"] for r in results] == ["stale", "stale", "fallback"]
+    assert stub.path_counts[FORECAST] == requests_so_far
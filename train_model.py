@@ -1,39 +1,89 @@
 # train_model.py
+import argparse
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.preprocessing import LabelEncoder
-import joblib
+from model_bundle import MODEL_PATH, archive, bundle_from_sklearn, write_bundle
 
-# 1. Load Data
-df = pd.read_csv('clothing_data.csv')
+COLUMNS = ['Weather', 'Event', 'Skin_Tone', 'Outfit']
 
-# 2. Preprocessing
-le_weather = LabelEncoder()
-le_event = LabelEncoder()
-le_skin = LabelEncoder()
-le_outfit = LabelEncoder()
 
-df['Weather_n'] = le_weather.fit_transform(df['Weather'])
-df['Event_n'] = le_event.fit_transform(df['Event'])
-df['Skin_n'] = le_skin.fit_transform(df['Skin_Tone'])
-df['Outfit_n'] = le_outfit.fit_transform(df['Outfit'])
+def count_rows(path, chunk_size=1_000_000):
+    """
+    Reduces the CSV to one row per distinct (Weather, Event, Skin_Tone, Outfit)
+    with a Count column, reading `chunk_size` rows at a time so memory stays
+    constant however big the file is.
+    """
+    counts = None
+    for chunk in pd.read_csv(path, usecols=COLUMNS, dtype='category', chunksize=chunk_size):
+        chunk_counts = chunk.groupby(COLUMNS, observed=True).size()
+        chunk_counts.index = chunk_counts.index.set_levels([lvl.astype(str) for lvl in chunk_counts.index.levels])
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+    return counts.astype('int64').rename('Count').reset_index()
 
-X = df[['Weather_n', 'Event_n', 'Skin_n']]
-y = df['Outfit_n']
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+def fit_encoders(df):
+    le_weather = LabelEncoder().fit(df['Weather'])
+    le_event = LabelEncoder().fit(df['Event'])
+    le_skin = LabelEncoder().fit(df['Skin_Tone'])
+    le_outfit = LabelEncoder().fit(df['Outfit'])
+    return le_weather, le_event, le_skin, le_outfit
 
-# --- THE FIX IS HERE ---
-# max_depth=3 makes the tree simpler and the graph readable
-model = DecisionTreeClassifier(max_depth=3, random_state=42) 
-model.fit(X_train, y_train)
 
-# 4. Save everything
-joblib.dump(model, 'model.pkl')
-joblib.dump(le_weather, 'le_weather.pkl')
-joblib.dump(le_event, 'le_event.pkl')
-joblib.dump(le_skin, 'le_skin.pkl')
-joblib.dump(le_outfit, 'le_outfit.pkl')
+def encode(df, le_weather, le_event, le_skin, le_outfit):
+    X = pd.DataFrame({
+        'Weather_n': le_weather.transform(df['Weather']),
+        'Event_n': le_event.transform(df['Event']),
+        'Skin_n': le_skin.transform(df['Skin_Tone']),
+    })
+    return X, le_outfit.transform(df['Outfit'])
 
-print("✅ Model Retrained with cleaner logic (Depth 3)!")
\ No newline at end of file
+
+def new_model():
+    # --- THE FIX IS HERE ---
+    # max_depth=3 makes the tree simpler and the graph readable
+    return DecisionTreeClassifier(max_depth=3, random_state=42)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the outfit model")
+    parser.add_argument('--data', default='clothing_data.csv')
+    parser.add_argument('--aggregate', action='store_true',
+                        help="Fit on every row via (features, outfit, count) totals built chunk by chunk")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.aggregate:
+        # 1. Load Data as counts: at most 60 cells x a few outfits, whatever the row count
+        df = count_rows(args.data, args.chunk_size)
+        print(f"📊 {df['Count'].sum()} rows reduced to {len(df)} distinct combinations")
+
+        # 2. Preprocessing
+        le_weather, le_event, le_skin, le_outfit = fit_encoders(df)
+        X, y = encode(df, le_weather, le_event, le_skin, le_outfit)
+
+        # 3. Each distinct row stands in for `Count` identical rows
+        model = new_model()
+        model.fit(X, y, sample_weight=df['Count'])
+    else:
+        # 1. Load Data
+        df = pd.read_csv(args.data)
+
+        # 2. Preprocessing
+        le_weather, le_event, le_skin, le_outfit = fit_encoders(df)
+        X, y = encode(df, le_weather, le_event, le_skin, le_outfit)
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        # 3. Fit
+        model = new_model()
+        model.fit(X_train, y_train)
+
+    # 4. Save the tree + all four vocabularies as one versioned bundle
+    #    (written atomically; running apps and services hot-reload it, see model_registry.py)
+    header = write_bundle(MODEL_PATH, *bundle_from_sklearn(model, le_weather, le_event, le_skin, le_outfit))
+    archive(MODEL_PATH)
+
+    print("✅ Model Retrained with cleaner logic (Depth 3)!")
+    print(f"📦 Saved '{MODEL_PATH}' (version {header['content_hash'][:16]})")
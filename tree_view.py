@@ -0,0 +1,124 @@
+# tree_view.py
+import os
+from model_bundle import FEATURE_NAMES
+from metrics_module import timed
+
+TREE_CACHE_DIR = os.environ.get("VOGUE_TREE_CACHE", ".cache")
+
+
+def _label_set(vocab, threshold, left):
+    """Encoded labels are ordinal, so 'x <= 1.5' is really a set of labels."""
+    chosen = [v for i, v in enumerate(vocab) if (i <= threshold) == left]
+    return ", ".join(chosen)
+
+
+def _is_leaf(t, node):
+    return t.children_left[node] == t.children_right[node]
+
+
+def _layout(t):
+    """x/y positions for every node: leaves evenly spaced, parents centred over children."""
+    pos = {}
+    next_leaf = [0]
+
+    def place(node, depth):
+        if _is_leaf(t, node):
+            x = next_leaf[0]
+            next_leaf[0] += 1
+        else:
+            x = (place(t.children_left[node], depth + 1) + place(t.children_right[node], depth + 1)) / 2
+        pos[node] = (x, -depth)
+        return x
+
+    place(0, 0)
+    return pos, next_leaf[0]
+
+
+@timed("render_tree_png")
+def render_tree_png(bundle, cache_dir=TREE_CACHE_DIR):
+    """
+    Draws the full decision tree once per model version and returns the PNG
+    bytes. Later calls (and other workers) read the cached file instead.
+    """
+    path = os.path.join(cache_dir, f"tree_{bundle.version}.png")
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    t = bundle.tree
+    vocabularies = [bundle.vocabularies[k] for k in ("weather", "event", "skin")]
+    outfits = bundle.vocabularies["outfit"]
+    pos, n_leaves = _layout(t)
+    depth = -min(y for _, y in pos.values())
+
+    fig, ax = plt.subplots(figsize=(max(12, n_leaves * 3.6), max(6, (depth + 1) * 3)))
+    try:
+        fig.patch.set_facecolor('#FFFFFF')
+        ax.set_facecolor('#FFFFFF')
+        ax.axis('off')
+
+        for node, (x, y) in pos.items():
+            if _is_leaf(t, node):
+                text = f"{outfits[t.node_class[node]]}\nsamples = {t.n_node_samples[node]}"
+                color = '#F5D78B'
+            else:
+                feature = t.feature[node]
+                text = (f"{FEATURE_NAMES[feature]} in\n{{{_label_set(vocabularies[feature], t.threshold[node], True)}}}"
+                        f"\ngini = {t.impurity[node]:.2f}\nsamples = {t.n_node_samples[node]}")
+                color = '#EDEDED'
+                for child, side in ((t.children_left[node], "yes"), (t.children_right[node], "no")):
+                    cx, cy = pos[child]
+                    ax.annotate("", xy=(cx, cy), xytext=(x, y), arrowprops=dict(arrowstyle="-", color="#555555"), zorder=1)
+                    ax.text((x + cx) / 2, (y + cy) / 2, side, fontsize=9, color="#555555", ha="center")
+            ax.text(x, y, text, ha="center", va="center", fontsize=10,
+                    bbox=dict(boxstyle="round,pad=0.5", facecolor=color, edgecolor="#333333"), zorder=3)
+
+        ax.set_xlim(-0.7, n_leaves - 0.3)
+        ax.set_ylim(-depth - 0.6, 0.6)
+
+        # Write to a temp name first so a half-written PNG is never served
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fig.savefig(tmp_path, format='png', bbox_inches='tight', dpi=80)
+        os.replace(tmp_path, path)
+    finally:
+        plt.close(fig)  # figures are never garbage collected while pyplot tracks them
+
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@timed("decision_path")
+def decision_path_dot(bundle, x):
+    """
+    Graphviz DOT for just the nodes one prediction passes through.
+    `x` is the encoded (weather, event, skin) row.
+    """
+    t = bundle.tree
+    vocabularies = [bundle.vocabularies[k] for k in ("weather", "event", "skin")]
+    lines = [
+        'digraph path {',
+        '  bgcolor="transparent";',
+        '  node [shape=box, style="rounded,filled", fillcolor="#1A1A1A", color="#F5D78B", fontcolor="#EDEDED", fontname="Inter"];',
+        '  edge [color="#F5D78B", fontcolor="#AAAAAA", fontname="Inter"];'
+    ]
+
+    node = 0
+    while not _is_leaf(t, node):
+        feature = t.feature[node]
+        threshold = t.threshold[node]
+        go_left = x[feature] <= threshold
+        child = t.children_left[node] if go_left else t.children_right[node]
+
+        lines.append(f'  n{node} [label="{FEATURE_NAMES[feature]}?"];')
+        lines.append(f'  n{node} -> n{child} [label="{_label_set(vocabularies[feature], threshold, go_left)}"];')
+        node = child
+
+    outfit = bundle.vocabularies["outfit"][t.node_class[node]]
+    lines.append(f'  n{node} [label="{outfit}", fillcolor="#F5D78B", fontcolor="#111111"];')
+    lines.append('}')
+    return "\n".join(lines)
@@ -0,0 +1,140 @@
+# weather_cache.py
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_city(city_name):
+    """'paris', 'Paris ' and 'PARIS' all map to the same cache key."""
+    return " ".join(str(city_name).split()).casefold()
+
+
+class GeocodeStore:
+    """
+    On-disk city -> (lat, lon) store. Coordinates never change, so entries
+    never expire and survive restarts.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Opened lazily so importing the module doesn't touch the disk
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "city TEXT PRIMARY KEY, latitude REAL NOT NULL, longitude REAL NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, city_name):
+        key = normalize_city(city_name)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT latitude, longitude FROM geocode WHERE city = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row
+
+    def set(self, city_name, lat, lon):
+        key = normalize_city(city_name)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode (city, latitude, longitude, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, lat, lon, time.time())
+            )
+            conn.commit()
+
+    def clear(self):
+        """Forgets every stored city."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM geocode")
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TTLCache:
+    """
+    Bounded in-memory LRU whose entries expire `ttl` seconds after being
+    stored. With `stale_ttl`, expired entries are kept that much longer and
+    can still be read (with their age) through get_stale().
+    """
+
+    def __init__(self, maxsize=1024, ttl=600, stale_ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._data = OrderedDict()  # key -> (stored at, value)
+        self._lock = threading.Lock()
+
+    def _age(self, key):
+        """Age of a live entry (dropping it if it is past even the stale window), else None."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age > self.ttl + self.stale_ttl:
+            del self._data[key]
+            return None
+        return age
+
+    def get(self, key):
+        with self._lock:
+            age = self._age(key)
+            if age is None or age > self.ttl:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][1]
+
+    def get_stale(self, key):
+        """
+        (value, age in seconds) even if expired, as long as it's within the
+        stale window; else None. Expired reads count as stale_hits.
+        """
+        with self._lock:
+            age = self._age(key)
+            if age is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if age > self.ttl:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return self._data[key][1], age
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
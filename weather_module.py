@@ -1,53 +1,442 @@
 # weather_module.py
-import requests
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import http_client
+from http_client import CircuitBreaker, CircuitOpenError
+from gazetteer import gazetteer
+from metrics_module import inc, span, timed
+from weather_cache import GeocodeStore, TTLCache, normalize_city
+
+# --- API ENDPOINTS ---
+# Overridable so the app can be pointed at a local stub (see stub_server.py)
+GEOCODE_URL = os.environ.get("VOGUE_GEOCODE_URL", "https://geocoding-api.open-meteo.com/v1/search")
+FORECAST_URL = os.environ.get("VOGUE_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+
+# --- CACHE SETTINGS ---
+# Coordinates are kept on disk forever; current weather is reused for a few minutes
+GEOCODE_DB = os.environ.get("VOGUE_GEOCODE_DB", "geocode_cache.sqlite3")
+FORECAST_TTL = float(os.environ.get("VOGUE_FORECAST_TTL", 600))
+FORECAST_CACHE_SIZE = int(os.environ.get("VOGUE_FORECAST_CACHE_SIZE", 1024))
+
+# --- STALENESS ---
+# Past FORECAST_TTL, weather up to STALE_TTL older is still answered straight
+# away while a background refresh runs; up to MAX_STALE older it is only used
+# when the upstream can't be reached
+STALE_TTL = float(os.environ.get("VOGUE_WEATHER_STALE_TTL", 3600))
+MAX_STALE = float(os.environ.get("VOGUE_WEATHER_MAX_STALE", 86400))
+REFRESH_WORKERS = int(os.environ.get("VOGUE_WEATHER_REFRESH_WORKERS", 4))
+
+FALLBACK_WEATHER = ("Moderate", 25)
+
+geocode_store = GeocodeStore(GEOCODE_DB)
+forecast_cache = TTLCache(maxsize=FORECAST_CACHE_SIZE, ttl=FORECAST_TTL, stale_ttl=MAX_STALE)
+
+# One breaker per Open-Meteo API: while one is open its calls fail immediately
+breakers = {"geocode": CircuitBreaker("geocode"), "forecast": CircuitBreaker("forecast")}
+
+# How many cities get_weather_many resolves at the same time
+WEATHER_CONCURRENCY = int(os.environ.get("VOGUE_WEATHER_CONCURRENCY", 16))
+
+# Open-Meteo accepts comma-separated coordinate lists; this many locations go in one forecast call
+FORECAST_BATCH_SIZE = int(os.environ.get("VOGUE_FORECAST_BATCH_SIZE", 100))
+
+# Lookups currently on the wire, so duplicate callers can wait for them instead
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Background refreshes of stale entries (the pool starts on first use)
+_refreshing = set()
+_refresh_pool = None
+
+# WMO Weather Codes: 51-67, 80-82 are Rain/Drizzle
+RAIN_CODES = [51, 53, 55, 61, 63, 65, 80, 81, 82]
+
+# Temperature bands (°C): Hot at or above HOT_TEMP, Moderate from MODERATE_TEMP, Cold below
+HOT_TEMP = 30
+MODERATE_TEMP = 20
+
+# categorize_weather_array returns indices into this tuple
+WEATHER_CATEGORIES = ("Rainy", "Hot", "Moderate", "Cold")
+
+# Open-Meteo serves at most this many forecast days
+MAX_FORECAST_DAYS = 16
+
+def _api_get(endpoint, url, params):
+    """GET + JSON from Open-Meteo through the endpoint's circuit breaker, counting failures."""
+    with span(f"{endpoint}_api"):
+        try:
+            return breakers[endpoint].call(http_client.get_json, url, params=params)
+        except CircuitOpenError:
+            inc("vogue_weather_circuit_rejections_total", endpoint=endpoint)
+            raise
+        except Exception:
+            inc("vogue_weather_api_failures_total", endpoint=endpoint)
+            raise
+
+@timed("geocode")
+def geocode(city_name):
+    """
+    Returns (latitude, longitude) for a city, or None if it can't be found.
+    Tries the offline gazetteer, then the on-disk geocode store, and only
+    then the remote geocoder. Typos the remote can't resolve get a fuzzy
+    gazetteer match as a last resort.
+    """
+    place = gazetteer.lookup(city_name)
+    if place is not None:
+        return place.latitude, place.longitude
+
+    cached = geocode_store.get(city_name)
+    if cached is not None:
+        return cached
+
+    try:
+        geo_response = _api_get("geocode", GEOCODE_URL, {
+            "name": city_name, "count": 1, "language": "en", "format": "json"
+        })
+    except Exception:
+        # Offline or rate limited: a close gazetteer match beats the 25°C fallback
+        place = gazetteer.fuzzy(city_name)
+        if place is None:
+            raise
+        return place.latitude, place.longitude
+
+    if 'results' not in geo_response:
+        place = gazetteer.fuzzy(city_name)
+        return None if place is None else (place.latitude, place.longitude)
+
+    lat = geo_response['results'][0]['latitude']
+    lon = geo_response['results'][0]['longitude']
+    geocode_store.set(city_name, lat, lon)
+    return lat, lon
+
+@timed("forecast")
+def fetch_current_weather(lat, lon):
+    """Returns (temperature, weathercode) for a pair of coordinates."""
+    weather_response = _api_get("forecast", FORECAST_URL, {
+        "latitude": lat, "longitude": lon, "current_weather": "true"
+    })
+
+    current_weather = weather_response['current_weather']
+    return current_weather['temperature'], current_weather['weathercode']
+
+@timed("forecast_bulk")
+def fetch_current_weather_bulk(coords):
+    """
+    Returns [(temperature, weathercode), ...] for a list of (lat, lon) pairs
+    using a single multi-location forecast request.
+    """
+    weather_response = _api_get("forecast", FORECAST_URL, {
+        "latitude": ",".join(str(lat) for lat, _ in coords),
+        "longitude": ",".join(str(lon) for _, lon in coords),
+        "current_weather": "true"
+    })
+
+    # One location comes back as an object, several as a list of objects
+    if isinstance(weather_response, dict):
+        weather_response = [weather_response]
+
+    return [(loc['current_weather']['temperature'], loc['current_weather']['weathercode']) for loc in weather_response]
+
+def categorize_weather(temp, weather_code):
+    """Buckets a temperature + WMO code into Hot, Moderate, Cold, or Rainy."""
+    if weather_code in RAIN_CODES:
+        return "Rainy"
+    elif temp >= HOT_TEMP:
+        return "Hot"
+    elif MODERATE_TEMP <= temp < HOT_TEMP:
+        return "Moderate"
+    else:
+        return "Cold"
+
+def categorize_weather_array(temps, weather_codes):
+    """
+    categorize_weather over whole arrays at once. Returns an int array of
+    indices into WEATHER_CATEGORIES; missing temperatures (NaN) count as Cold.
+    """
+    import numpy as np
+
+    temps = np.asarray(temps, dtype=float)
+    weather_codes = np.asarray(weather_codes, dtype=float)
+    return np.select(
+        [np.isin(weather_codes, RAIN_CODES), temps >= HOT_TEMP, temps >= MODERATE_TEMP],
+        [0, 1, 2],
+        default=3
+    )
+
+@timed("forecast_horizon")
+def fetch_forecast_horizon(lat, lon, days):
+    """
+    The hourly and daily forecast for the next `days` days at one location,
+    in a single request, with times in the location's own timezone.
+    Returns the Open-Meteo 'hourly' and 'daily' blocks as {field: list}.
+    """
+    weather_response = _api_get("forecast", FORECAST_URL, {
+        "latitude": lat, "longitude": lon,
+        "hourly": "temperature_2m,weathercode",
+        "daily": "weathercode,temperature_2m_max,temperature_2m_min",
+        "forecast_days": days, "timezone": "auto"
+    })
+    return weather_response['hourly'], weather_response['daily']
+
+def _claim(key):
+    """
+    (future, is_leader) for a key: a new Future the caller must _settle if
+    nobody is looking the key up yet, else the one the leader will settle.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future, False
+        future = _inflight[key] = Future()
+        return future, True
+
+def _settle(key, future, result=None, error=None):
+    """Hands a leader's result (or error) to everyone waiting on the key and frees it."""
+    if error is None:
+        future.set_result(result)
+    else:
+        future.set_exception(error)
+    with _inflight_lock:
+        del _inflight[key]
+
+def _single_flight(key, fetch):
+    """
+    Runs `fetch()` once per key at a time: concurrent callers asking for the
+    same key wait for the leader's result instead of making their own request.
+    """
+    future, is_leader = _claim(key)
+    if not is_leader:
+        return future.result()
+
+    try:
+        result = fetch()
+    except BaseException as e:
+        _settle(key, future, error=e)
+        raise
+    _settle(key, future, result)
+    return result
+
+def _shared_geocode(city_name, key):
+    """geocode(), shared with any other caller geocoding the same city right now."""
+    return _single_flight(("geocode", key), lambda: geocode(city_name))
+
+def _lookup_weather(city_name, key):
+    """Geocodes + fetches + categorizes one city. Returns None if the city is unknown."""
+    coords = _shared_geocode(city_name, key)
+    if coords is None:
+        return None
+
+    temp, weather_code = fetch_current_weather(*coords)
+    result = (categorize_weather(temp, weather_code), temp)
+    forecast_cache.set(key, result)
+    return result
+
+def _freshness(status, age=None):
+    return {"status": status, "age_s": None if age is None else round(age)}
+
+def _refresh_in_background(city_name, key):
+    """Re-fetches one city on the refresh pool, unless it's already being fetched."""
+    global _refresh_pool
+    with _inflight_lock:
+        if key in _refreshing or key in _inflight:
+            return
+        _refreshing.add(key)
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="weather-refresh")
+
+    def refresh():
+        try:
+            _single_flight(key, lambda: _lookup_weather(city_name, key))
+        except Exception:
+            inc("vogue_weather_refresh_failures_total")
+        finally:
+            with _inflight_lock:
+                _refreshing.discard(key)
+
+    _refresh_pool.submit(refresh)
+
+def cached_weather(city_name):
+    """
+    get_weather_tagged's answer if it can be given without waiting on the
+    network: fresh, or mildly stale (a refresh is then started). Else None.
+    """
+    key = normalize_city(city_name)
+    entry = forecast_cache.get_stale(key)
+    if entry is None:
+        return None
+    (category, temp), age = entry
+    if age <= FORECAST_TTL:
+        return category, temp, _freshness("cached", age)
+    if age <= FORECAST_TTL + STALE_TTL:
+        _refresh_in_background(city_name, key)
+        return category, temp, _freshness("stale", age)
+    return None
+
+@timed("weather")
+def get_weather_tagged(city_name):
+    """
+    get_weather plus how fresh the answer is, as {"status", "age_s"}:
+    "live" (just fetched), "cached" (within FORECAST_TTL), "stale" (older,
+    served while it refreshes or while the upstream is down) or "fallback".
+    """
+    try:
+        # 1. Recently looked up (or only mildly stale)? Reuse it.
+        cached = cached_weather(city_name)
+        if cached is not None:
+            return cached
+
+        # 2. Get Coordinates + Weather (shared with anyone already asking for this city)
+        key = normalize_city(city_name)
+        result = _single_flight(key, lambda: _lookup_weather(city_name, key))
+        if result is None:
+            print(f"❌ City '{city_name}' not found.")
+            inc("vogue_weather_fallbacks_total", reason="not_found")
+            return (*FALLBACK_WEATHER, _freshness("fallback"))  # Default fallback if city is wrong
+        return (*result, _freshness("live", 0))
+
+    except Exception as e:
+        if not isinstance(e, CircuitOpenError):
+            print(f"Error fetching weather: {e}")
+
+        # 3. Upstream down (or its breaker open): an old answer beats the default
+        entry = forecast_cache.get_stale(normalize_city(city_name))
+        if entry is not None:
+            inc("vogue_weather_fallbacks_total", reason="stale")
+            return (*entry[0], _freshness("stale", entry[1]))
+        inc("vogue_weather_fallbacks_total", reason="error")
+        return (*FALLBACK_WEATHER, _freshness("fallback")) # Fallback
 
 def get_weather(city_name):
     """
-    Fetches temperature for a city and categorizes it into 
+    Fetches temperature for a city and categorizes it into
     Hot, Moderate, Cold, or Rainy.
     """
+    category, temp, _ = get_weather_tagged(city_name)
+    return category, temp
+
+def _try_geocode(city_name, key):
+    """geocode() for the bulk path: None if the city is unknown, the exception if the lookup failed."""
     try:
-        # 1. Get Coordinates (Latitude & Longitude) for the City
-        geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city_name}&count=1&language=en&format=json"
-        geo_response = requests.get(geo_url).json()
-        
-        if 'results' not in geo_response:
-            print(f"❌ City '{city_name}' not found.")
-            return "Moderate", 25  # Default fallback if city is wrong
-            
-        lat = geo_response['results'][0]['latitude']
-        lon = geo_response['results'][0]['longitude']
-        
-        # 2. Get Weather Data using Coordinates
-        weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true"
-        weather_response = requests.get(weather_url).json()
-        
-        # 3. Extract Temperature and Weather Code
-        current_weather = weather_response['current_weather']
-        temp = current_weather['temperature']
-        weather_code = current_weather['weathercode'] # Codes for rain/snow etc.
-        
-        # 4. Categorize the Weather
-        # WMO Weather Codes: 51-67, 80-82 are Rain/Drizzle
-        is_rainy = weather_code in [51, 53, 55, 61, 63, 65, 80, 81, 82]
-
-        if is_rainy:
-            category = "Rainy"
-        elif temp >= 30:
-            category = "Hot"
-        elif 20 <= temp < 30:
-            category = "Moderate"
-        else:
-            category = "Cold"
-            
-        return category, temp
-        
+        return _shared_geocode(city_name, key)
     except Exception as e:
         print(f"Error fetching weather: {e}")
-        return "Moderate", 25 # Fallback
+        return e
+
+def _fallback_weather(key, reason):
+    """The bulk path's answer for a city it couldn't look up: its last known weather, else the default."""
+    entry = forecast_cache.get_stale(key) if reason == "error" else None
+    if entry is not None:
+        inc("vogue_weather_fallbacks_total", reason="stale")
+        return (*entry[0], _freshness("stale", entry[1]))
+    inc("vogue_weather_fallbacks_total", reason=reason)
+    return (*FALLBACK_WEATHER, _freshness("fallback"))  # Default fallback if city is wrong
+
+def get_weather_many_tagged(city_names, max_workers=WEATHER_CONCURRENCY, batch_size=FORECAST_BATCH_SIZE):
+    """
+    Resolves many cities and returns [(category, temp, freshness), ...] in
+    input order, freshness as in get_weather_tagged. Each distinct
+    (normalized) city is geocoded once, concurrently, and the forecasts are
+    fetched `batch_size` locations per request. Cities another caller is
+    already looking up are waited for, not fetched again.
+    """
+    city_names = list(city_names)
+    resolved = {}
+    pending = {}  # key -> city name, for the cities this call looks up
+    leaders = {}  # key -> Future this call must settle for anyone waiting on it
+    waiting = {}  # key -> Future of a lookup someone else has on the wire
+
+    # 1. Serve what we can from the cache (mildly stale entries refresh in
+    #    the background) and claim the rest
+    for name in city_names:
+        key = normalize_city(name)
+        if key in resolved or key in pending or key in waiting:
+            continue
+        cached = cached_weather(name)
+        if cached is not None:
+            resolved[key] = cached
+            continue
+        future, is_leader = _claim(key)
+        if is_leader:
+            pending[key] = name
+            leaders[key] = future
+        else:
+            waiting[key] = future
+
+    if pending:
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+                # 2. Geocode the misses concurrently
+                located = []
+                for key, coords in zip(pending, pool.map(_try_geocode, pending.values(), pending)):
+                    if coords is None:
+                        print(f"❌ City '{pending[key]}' not found.")
+                        _settle(key, leaders.pop(key), None)
+                        resolved[key] = _fallback_weather(key, "not_found")
+                    elif isinstance(coords, Exception):
+                        _settle(key, leaders.pop(key), error=coords)
+                        resolved[key] = _fallback_weather(key, "error")
+                    else:
+                        located.append((key, coords))
+
+                # 3. Pack the coordinates into bulk forecast requests
+                batches = [located[i:i + batch_size] for i in range(0, len(located), batch_size)]
+                futures = [pool.submit(fetch_current_weather_bulk, [coords for _, coords in batch]) for batch in batches]
+
+                # 4. Categorize every location, remember it and pass it on to anyone waiting
+                for batch, future in zip(batches, futures):
+                    try:
+                        readings = future.result()
+                        if len(readings) != len(batch):
+                            raise ValueError(f"forecast returned {len(readings)} locations for {len(batch)}")
+                    except Exception as e:
+                        if not isinstance(e, CircuitOpenError):
+                            print(f"Error fetching weather: {e}")
+                        for key, _ in batch:
+                            _settle(key, leaders.pop(key), error=e)
+                            resolved[key] = _fallback_weather(key, "error")
+                        continue
+
+                    for (key, _), (temp, weather_code) in zip(batch, readings):
+                        result = (categorize_weather(temp, weather_code), temp)
+                        forecast_cache.set(key, result)
+                        _settle(key, leaders.pop(key), result)
+                        resolved[key] = (*result, _freshness("live", 0))
+        finally:
+            # Never leave a claimed city hanging, whatever went wrong above
+            for key, future in leaders.items():
+                _settle(key, future, error=RuntimeError(f"weather lookup for '{pending[key]}' was abandoned"))
+
+    # 5. Cities someone else was already looking up: take their answer
+    for key, future in waiting.items():
+        try:
+            result = future.result()
+        except Exception:
+            resolved[key] = _fallback_weather(key, "error")
+            continue
+        resolved[key] = (*result, _freshness("live", 0)) if result is not None else _fallback_weather(key, "not_found")
+
+    return [resolved[normalize_city(name)] for name in city_names]
+
+def get_weather_many(city_names, max_workers=WEATHER_CONCURRENCY, batch_size=FORECAST_BATCH_SIZE):
+    """get_weather for many cities at once: [(category, temp), ...] in input order."""
+    return [(category, temp) for category, temp, _ in get_weather_many_tagged(city_names, max_workers, batch_size)]
+
+def circuit_states():
+    """Each Open-Meteo breaker's state: closed, open or half_open."""
+    return {name: breaker.state for name, breaker in breakers.items()}
+
+def cache_stats():
+    """Hit/miss counters for the gazetteer, the geocode store and the forecast cache."""
+    return {
+        "gazetteer": {"hits": gazetteer.hits, "misses": gazetteer.misses},
+        "geocode": {"hits": geocode_store.hits, "misses": geocode_store.misses},
+        "forecast": {"hits": forecast_cache.hits, "misses": forecast_cache.misses,
+                     "stale_hits": forecast_cache.stale_hits, "size": len(forecast_cache)}
+    }
 
 # TEST BLOCK (This only runs if you run this specific file)
 if __name__ == "__main__":
     city = input("Test City: ")
     cat, t = get_weather(city)
-    print(f"Result: {t}°C -> {cat}")
\ No newline at end of file
+    print(f"Result: {t}°C -> {cat}")